@@ -14,6 +14,23 @@ print_message () {
     echo -e "${left_filler_len// /$symbol}$message${right_filler_len// /$symbol}\033[0m"
 }
 
+run_project () {
+    # Run pytest in the project directory (first argument) with the settings
+    # module (second argument); the rest of the arguments go to pytest.
+    local project=$1
+    local settings_module=$2
+    shift 2
+    (
+        cd "$project" &&
+        export DJANGO_SETTINGS_MODULE="$settings_module" &&
+        pytest --tb=line "$@" 1>&2
+    )
+}
+
+# With --parallel both projects are tested at the same time using pytest-xdist.
+parallel=""
+if [[ "$1" == "--parallel" ]]; then parallel=1; fi
+
 
 if python -m flake8 --config=setup.cfg 1>&2;
 then
@@ -21,14 +38,33 @@ then
     echo $LF 1>&2
     if python structure_test.py
     then
-        cd ya_news
-        export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanews.settings"}"
-        if pytest --tb=line 1>&2;
+        if [[ -n "$parallel" ]]
+        then
+            # Both projects run at once; pytest-xdist spreads each project's
+            # tests over the cores, pytest-django gives every worker its own DB.
+            run_project ya_news "${DJANGO_SETTINGS_MODULE:-yanews.settings}" -n auto & news_pid=$!
+            run_project ya_note yanote.settings -n auto & note_pid=$!
+            wait $news_pid
+            news_status=$?
+            wait $note_pid
+            note_status=$?
+            if [[ $news_status -ne 0 ]]
+            then
+                print_message " При запуске упали ваши тесты для проекта YaNews. Проверьте тесты этого проекта " "=" 1
+                echo \`\`\` 1>&2
+                exit $news_status
+            fi
+            if [[ $note_status -ne 0 ]]
+            then
+                print_message " При запуске упали ваши тесты для проекта YaNote. Проверьте тесты этого проекта " "=" 1
+                echo \`\`\` 1>&2
+                exit $note_status
+            fi
+            exit 0
+        fi
+        if run_project ya_news "${DJANGO_SETTINGS_MODULE:-yanews.settings}";
         then
-            cd ../ya_note
-            unset DJANGO_SETTINGS_MODULE
-            export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanote.settings"}"
-            if pytest --tb=line 1>&2;
+            if run_project ya_note yanote.settings;
             then
                 exit 0
             else
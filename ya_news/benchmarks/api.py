@@ -0,0 +1,59 @@
+"""Стоимость сериализации в JSON API и размер ответов.
+
+Сравнивает сериализацию комментариев через values_list() с созданием
+моделей и model_to_dict(), а затем размеры HTML-страницы новости
+и ответа API с теми же комментариями.
+"""
+import argparse
+import json
+
+from . import test_database, timer
+
+
+def main(count):
+    from django.core.serializers.json import DjangoJSONEncoder
+    from django.forms.models import model_to_dict
+    from django.test import Client
+    from django.urls import reverse
+
+    from news.api import COMMENT_FIELDS, serialize, with_archived_flag
+    from news.factories import make_comments, make_news, make_users
+    from news.models import Comment
+
+    news = make_news(1)
+    make_comments(news, make_users(10), count, fetch=False)
+    fields = tuple(COMMENT_FIELDS)
+
+    with timer('values_list()', count):
+        rows = serialize(
+            with_archived_flag(Comment.objects.all()), fields, COMMENT_FIELDS
+        )
+        json.dumps(rows, cls=DjangoJSONEncoder)
+    with timer('Модели и model_to_dict()', count):
+        rows = [
+            {
+                **model_to_dict(comment),
+                'author_username': comment.author.username,
+                'created': comment.created,
+            }
+            for comment in Comment.objects.select_related('author')
+        ]
+        json.dumps(rows, cls=DjangoJSONEncoder)
+
+    client = Client()
+    html = client.get(reverse('news:detail', args=(news[0].pk,))).content
+    api = client.get(
+        reverse('news:api_news_comments', args=(news[0].pk,)),
+        {'limit': 100},
+        HTTP_ACCEPT_ENCODING='gzip'
+    ).content
+    print(f'HTML страницы новости: {len(html):,} байт')
+    print(f'API, 100 комментариев, gzip: {len(api):,} байт')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=100_000)
+    args = parser.parse_args()
+    with test_database():
+        main(args.count)
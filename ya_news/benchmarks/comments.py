@@ -0,0 +1,53 @@
+"""Пропускная способность записи комментариев.
+
+Сравнивает синхронную запись в NewsComment с отложенной пакетной
+записью (NEWS_COMMENT_WRITE_BEHIND). БД — файл SQLite, как в проекте.
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+from . import test_database, timer
+
+
+def post_comments(client, url, count):
+    for index in range(count):
+        client.post(url, {'text': f'Комментарий {index}'})
+
+
+def main(count):
+    from django.contrib.auth import get_user_model
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    from news import write_behind
+    from news.models import Comment, News
+
+    user = get_user_model().objects.create(username='Читатель')
+    news = News.objects.create(title='Заголовок', text='Текст')
+    url = reverse('news:detail', args=(news.pk,))
+    client = Client()
+    client.force_login(user)
+    override_settings(RATELIMIT_ENABLED=False).enable()
+
+    with timer('Синхронная запись', count):
+        post_comments(client, url, count)
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        with override_settings(
+            NEWS_COMMENT_WRITE_BEHIND=True, NEWS_COMMENT_SPILL_DIR=spill_dir
+        ):
+            with timer('Отложенная запись, ответы и сброс', count):
+                with timer('Отложенная запись, только ответы', count):
+                    post_comments(client, url, count)
+                write_behind.get_writer().stop()
+    assert Comment.objects.count() == 2 * count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=2000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as db_dir:
+        with test_database(str(Path(db_dir) / 'bench.sqlite3')):
+            main(args.count)
@@ -0,0 +1,42 @@
+"""Время и пиковая память выгрузки комментариев.
+
+Прирост пикового RSS процесса за время выгрузки не должен зависеть
+от числа строк.
+"""
+import argparse
+import os
+import resource
+import tempfile
+from pathlib import Path
+
+from . import test_database, timer
+
+
+def seed(rows):
+    from news.factories import make_comments, make_news, make_users
+
+    make_comments(make_news(100), make_users(100), rows, fetch=False)
+
+
+def main(rows, export_format):
+    from news.export import export_chunks
+
+    with timer('Заполнение БД', rows):
+        seed(rows)
+    peak_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(os.devnull, 'w', encoding='utf-8') as output:
+        with timer(f'Выгрузка {export_format}', rows):
+            for chunk in export_chunks(export_format):
+                output.write(chunk)
+    peak_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f'Прирост пикового RSS: {(peak_after - peak_before) / 1024:.1f} МиБ')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--format', default='csv', choices=('csv', 'jsonl'))
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as db_dir:
+        with test_database(str(Path(db_dir) / 'bench.sqlite3')):
+            main(args.rows, args.format)
@@ -0,0 +1,26 @@
+"""Скорость заполнения БД фабриками news.factories."""
+import argparse
+import tempfile
+from pathlib import Path
+
+from . import test_database, timer
+
+
+def main(rows):
+    from news.factories import make_comments, make_news, make_users
+
+    with timer('Пользователи', 1000):
+        users = make_users(1000)
+    with timer('Новости', rows // 100):
+        news = make_news(rows // 100)
+    with timer('Комментарии', rows):
+        make_comments(news, users, rows, fetch=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as db_dir:
+        with test_database(str(Path(db_dir) / 'bench.sqlite3')):
+            main(args.rows)
@@ -1,11 +1,57 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.template.response import TemplateResponse
+from django.forms.models import BaseInlineFormSet
 
-from .models import Comment, News
+from .models import ArchivedComment, Comment, News, with_comment_count
+from .purge import delete_in_batches, delete_users
+
+PAGE_VAR = 'comments_page'
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """Формсет, который показывает одну страницу связанных объектов."""
+    per_page = 50
+    page_number = 1
+
+    def get_queryset(self):
+        if not hasattr(self, 'page'):
+            self.page = Paginator(
+                super().get_queryset(), self.per_page
+            ).get_page(self.page_number)
+            self._queryset = self.page.object_list
+        return self._queryset
 
 
 class CommentInline(admin.StackedInline):
+    """Комментарии новости постранично, от новых к старым.
+
+    Автор выводится только для чтения: виджет выбора из всех
+    пользователей на каждой форме делал страницу неподъёмной. Поэтому
+    и добавлять комментарии здесь нельзя — у нового не было бы автора.
+    """
     model = Comment
     extra = 0
+    formset = PaginatedInlineFormSet
+    template = 'admin/news/comment_inline.html'
+    readonly_fields = ('author',)
+    ordering = ('-created',)
+    per_page = 50
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('author')
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.per_page = self.per_page
+        formset.page_number = request.GET.get(PAGE_VAR, 1)
+        return formset
 
 
 @admin.register(News)
@@ -13,3 +59,83 @@ class NewsAdmin(admin.ModelAdmin):
     inlines = [
         CommentInline,
     ]
+    list_display = ('title', 'date', 'comment_count')
+    date_hierarchy = 'date'
+    search_fields = ('title',)
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return with_comment_count(super().get_queryset(request))
+
+    @admin.display(description='Комментариев', ordering='comment_count')
+    def comment_count(self, obj):
+        return obj.comment_count
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, self.model.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        """Сначала удаляет комментарии новостей порциями.
+
+        Каскад загрузил бы все комментарии в память и удалял бы их
+        одной долгой транзакцией, блокируя SQLite для читателей.
+        """
+        news_ids = list(queryset.values_list('pk', flat=True))
+        for model in (Comment, ArchivedComment):
+            delete_in_batches(
+                model._base_manager.filter(news_id__in=news_ids)
+            )
+        queryset.model.objects.filter(pk__in=news_ids).delete()
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'news', 'author', 'created')
+    list_select_related = ('news', 'author')
+    raw_id_fields = ('news', 'author')
+    date_hierarchy = 'created'
+    search_fields = ('text',)
+    show_full_result_count = False
+
+
+User = get_user_model()
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class BatchDeleteUserAdmin(UserAdmin):
+    actions = ('delete_with_comments',)
+
+    @admin.action(
+        description='Удалить выбранных пользователей с комментариями',
+        permissions=('delete',)
+    )
+    def delete_with_comments(self, request, queryset):
+        """Удаляет пользователей, а их комментарии — порциями.
+
+        Страница подтверждения показывает только количество
+        комментариев, не загружая их, в отличие от delete_selected.
+        """
+        if request.POST.get('post'):
+            count = queryset.count()
+            deleted = delete_users(queryset)
+            self.message_user(
+                request,
+                f'Удалено пользователей: {count}, комментариев: {deleted}.',
+                messages.SUCCESS
+            )
+            return None
+        return TemplateResponse(
+            request,
+            'admin/auth/user/delete_with_comments.html',
+            {
+                **self.admin_site.each_context(request),
+                'title': 'Удаление пользователей с комментариями',
+                'opts': self.model._meta,
+                'users': queryset,
+                'comment_count': Comment._base_manager.filter(
+                    author__in=queryset
+                ).count(),
+                'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+            }
+        )
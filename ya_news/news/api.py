@@ -0,0 +1,340 @@
+"""JSON API новостей и комментариев.
+
+Объекты сериализуются прямо из values_list() без создания моделей.
+Поддерживаются ?fields= для выбора полей и постраничный вывод
+по ключу: ?limit= и ?after= с курсором из поля next ответа.
+"""
+import base64
+import binascii
+import json
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q, Value
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views import generic
+from django.views.decorators.gzip import gzip_page
+
+from .forms import CommentForm
+from .models import Comment, EditConflict, News, with_comment_count
+from .ratelimit import RateLimitMixin
+from .views import CommentBase
+from .write_behind import get_writer
+
+# Поле API → выражение для values_list().
+NEWS_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'date': 'date',
+    'comment_count': 'comment_count',
+}
+NEWS_ORDERING = ('-date', '-id')
+
+COMMENT_FIELDS = {
+    'id': 'id',
+    'news': 'news_id',
+    'author': 'author_id',
+    'author_username': 'author__username',
+    'text': 'text',
+    'created': 'created',
+    'is_archived': 'is_archived',
+    'version': 'version',
+}
+COMMENT_ORDERING = ('created', 'id')
+
+
+class ApiError(Exception):
+    """Ошибка запроса, которая отдаётся клиенту как {"detail": ...}."""
+
+    def __init__(self, detail, status=HTTPStatus.BAD_REQUEST):
+        super().__init__(detail)
+        self.detail = detail
+        self.status = status
+
+
+def json_response(data, status=HTTPStatus.OK):
+    return JsonResponse(
+        data,
+        status=status,
+        safe=False,
+        json_dumps_params={'ensure_ascii': False}
+    )
+
+
+def parse_fields(request, available):
+    """Поля из ?fields=, по умолчанию все доступные."""
+    raw = request.GET.get('fields')
+    if not raw:
+        return tuple(available)
+    fields = tuple(dict.fromkeys(
+        name.strip() for name in raw.split(',') if name.strip()
+    ))
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise ApiError(f'Неизвестные поля: {", ".join(unknown)}.')
+    return fields
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.API_PAGE_SIZE))
+    except ValueError:
+        raise ApiError('limit должен быть целым числом.')
+    if not 1 <= limit <= settings.API_MAX_PAGE_SIZE:
+        raise ApiError(
+            f'limit должен быть от 1 до {settings.API_MAX_PAGE_SIZE}.'
+        )
+    return limit
+
+
+def encode_cursor(values):
+    # str() сохраняет микросекунды, которые DjangoJSONEncoder отбрасывает.
+    raw = json.dumps(values, default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(token, size):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise ApiError('Некорректный курсор.')
+    return values
+
+
+def after_cursor(ordering, values):
+    """Условие «строго после» для сортировки из двух полей."""
+    (first, second), (first_value, second_value) = ordering, values
+    lookups = [
+        (name.lstrip('-'), 'lt' if name.startswith('-') else 'gt')
+        for name in (first, second)
+    ]
+    (first, first_op), (second, second_op) = lookups
+    return Q(**{f'{first}__{first_op}': first_value}) | Q(**{
+        first: first_value, f'{second}__{second_op}': second_value
+    })
+
+
+def serialize(queryset, fields, expressions):
+    """Строки queryset как словари с полями fields."""
+    lookups = [expressions[name] for name in fields]
+    return [dict(zip(fields, row)) for row in queryset.values_list(*lookups)]
+
+
+def paginate(request, querysets, fields, expressions, ordering):
+    """Страница по ключу сортировки и курсор следующей.
+
+    Несколько querysets объединяются через UNION, условие курсора
+    накладывается на каждый из них.
+    """
+    limit = parse_limit(request)
+    keys = [name.lstrip('-') for name in ordering]
+    token = request.GET.get('after')
+    if token:
+        condition = after_cursor(ordering, decode_cursor(token, len(keys)))
+        try:
+            querysets = [queryset.filter(condition) for queryset in querysets]
+        except (ValidationError, TypeError, ValueError):
+            raise ApiError('Некорректный курсор.')
+    queryset, *others = querysets
+    if others:
+        # Части UNION не могут иметь своей сортировки.
+        queryset = queryset.order_by().union(
+            *(other.order_by() for other in others)
+        )
+    # Ключ сортировки нужен для курсора, даже если его не запросили.
+    selected = (*fields, *(key for key in keys if key not in fields))
+    rows = serialize(
+        queryset.order_by(*ordering)[:limit + 1], selected, expressions
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][key] for key in keys])
+    for row in rows:
+        for key in keys:
+            if key not in fields:
+                del row[key]
+    return {'results': rows, 'next': next_cursor}
+
+
+def parse_body(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except (UnicodeDecodeError, ValueError):
+        raise ApiError('Тело запроса должно быть JSON-объектом.')
+    if not isinstance(data, dict):
+        raise ApiError('Тело запроса должно быть JSON-объектом.')
+    return data
+
+
+def form_errors(form):
+    return json_response(
+        {'detail': 'Ошибка валидации.', 'errors': form.errors},
+        status=HTTPStatus.BAD_REQUEST
+    )
+
+
+class ApiMixin:
+    """Ответы с ошибками в JSON и сжатие gzip для представлений API."""
+
+    @method_decorator(gzip_page)
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return json_response(
+                {'detail': error.detail}, status=error.status
+            )
+        except Http404:
+            return json_response(
+                {'detail': 'Не найдено.'}, status=HTTPStatus.NOT_FOUND
+            )
+        except EditConflict:
+            return json_response(
+                {'detail': 'Запись изменена другим запросом.'},
+                status=HTTPStatus.CONFLICT
+            )
+
+    def handle_no_permission(self):
+        return json_response(
+            {'detail': 'Требуется авторизация.'},
+            status=HTTPStatus.UNAUTHORIZED
+        )
+
+    def http_method_not_allowed(self, request, *args, **kwargs):
+        response = json_response(
+            {'detail': 'Метод не поддерживается.'},
+            status=HTTPStatus.METHOD_NOT_ALLOWED
+        )
+        response['Allow'] = ', '.join(self._allowed_methods())
+        return response
+
+
+def news_queryset(fields):
+    queryset = News.objects.all()
+    if 'comment_count' in fields:
+        queryset = with_comment_count(queryset)
+    return queryset
+
+
+class NewsListApi(ApiMixin, generic.View):
+    """Список новостей от новых к старым."""
+
+    def get(self, request):
+        fields = parse_fields(request, NEWS_FIELDS)
+        return json_response(paginate(
+            request, [news_queryset(fields)], fields, NEWS_FIELDS,
+            NEWS_ORDERING
+        ))
+
+
+class NewsDetailApi(ApiMixin, generic.View):
+    """Новость по id."""
+
+    def get(self, request, pk):
+        fields = parse_fields(request, NEWS_FIELDS)
+        rows = serialize(
+            news_queryset(fields).filter(pk=pk), fields, NEWS_FIELDS
+        )
+        if not rows:
+            raise Http404
+        return json_response(rows[0])
+
+
+def with_archived_flag(queryset):
+    queryset = queryset.annotate(
+        is_archived=Value(queryset.model.is_archived)
+    )
+    if queryset.model.is_archived:
+        # Архивные комментарии не меняются, у них всегда первая версия.
+        queryset = queryset.annotate(version=Value(1))
+    return queryset
+
+
+def serialize_comment(pk):
+    return serialize(
+        with_archived_flag(Comment.objects.filter(pk=pk)),
+        tuple(COMMENT_FIELDS),
+        COMMENT_FIELDS
+    )[0]
+
+
+class NewsCommentsApi(ApiMixin, RateLimitMixin, generic.View):
+    """Комментарии новости от старых к новым и добавление комментария.
+
+    Если у новости есть архив, в список попадают и архивные комментарии.
+    """
+
+    def get(self, request, pk):
+        news = get_object_or_404(News.objects.only('has_archive'), pk=pk)
+        fields = parse_fields(request, COMMENT_FIELDS)
+        querysets = [with_archived_flag(news.comment_set.all())]
+        if news.has_archive:
+            querysets.append(
+                with_archived_flag(news.archivedcomment_set.all())
+            )
+        return json_response(paginate(
+            request, querysets, fields, COMMENT_FIELDS, COMMENT_ORDERING
+        ))
+
+    def post(self, request, pk):
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        news = get_object_or_404(News.objects.only('title'), pk=pk)
+        form = CommentForm(data=parse_body(request))
+        if not form.is_valid():
+            return form_errors(form)
+        if settings.NEWS_COMMENT_WRITE_BEHIND:
+            get_writer().put(
+                news_id=news.pk,
+                author_id=request.user.pk,
+                text=form.cleaned_data['text']
+            )
+            return json_response({}, status=HTTPStatus.ACCEPTED)
+        comment = form.save(commit=False)
+        comment.news = news
+        comment.author = request.user
+        comment.save()
+        return json_response(
+            serialize_comment(comment.pk), status=HTTPStatus.CREATED
+        )
+
+
+class CommentApi(ApiMixin, CommentBase, generic.View):
+    """Чтение, изменение и удаление своего комментария.
+
+    Если в теле PUT или PATCH передана version, комментарий меняется
+    только при совпадении версии, иначе возвращается 409.
+    """
+
+    def get(self, request, pk):
+        fields = parse_fields(request, COMMENT_FIELDS)
+        rows = serialize(
+            with_archived_flag(self.get_queryset().filter(pk=pk)),
+            fields,
+            COMMENT_FIELDS
+        )
+        if not rows:
+            raise Http404
+        return json_response(rows[0])
+
+    def put(self, request, pk):
+        comment = get_object_or_404(self.get_queryset(), pk=pk)
+        form = CommentForm(data=parse_body(request), instance=comment)
+        if not form.is_valid():
+            return form_errors(form)
+        form.save()
+        return json_response(serialize_comment(comment.pk))
+
+    patch = put
+
+    def delete(self, request, pk):
+        comment = get_object_or_404(self.get_queryset(), pk=pk)
+        comment.soft_delete()
+        return HttpResponse(status=HTTPStatus.NO_CONTENT)
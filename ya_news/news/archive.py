@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import ArchivedComment, Comment, News
+from .signals import comments_flushed
+
+ARCHIVED_FIELDS = ('id', 'news_id', 'author_id', 'text', 'created')
+
+
+def archive_cutoff(days=None):
+    """Новости старше этой даты считаются архивными."""
+    if days is None:
+        days = settings.NEWS_ARCHIVE_AFTER_DAYS
+    return date.today() - timedelta(days=days)
+
+
+def archive_comments(cutoff, chunk_size=1000):
+    """Переносит комментарии новостей старше cutoff в архив.
+
+    Каждая порция переносится в своей транзакции, чтобы не держать
+    блокировку SQLite на всё время переноса. Строки удаляются одним
+    DELETE без сигналов на каждую, вместо них на порцию отправляется
+    один comments_flushed. Новости получают отметку has_archive,
+    по которой их страницы читают архив. Возвращает количество
+    перенесённых комментариев.
+    """
+    queryset = Comment.objects.filter(
+        news__date__lt=cutoff
+    ).order_by('pk').values(*ARCHIVED_FIELDS)
+    moved = 0
+    while True:
+        with transaction.atomic():
+            batch = list(queryset[:chunk_size])
+            if not batch:
+                return moved
+            ArchivedComment.objects.bulk_create(
+                ArchivedComment(**row) for row in batch
+            )
+            news_ids = {row['news_id'] for row in batch}
+            News.objects.filter(
+                pk__in=news_ids, has_archive=False
+            ).update(has_archive=True)
+            Comment._base_manager.filter(
+                pk__in=[row['id'] for row in batch]
+            )._raw_delete(Comment.objects.db)
+            comments_flushed.send(sender=Comment, news_ids=news_ids)
+        moved += len(batch)
@@ -0,0 +1,75 @@
+import time
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db import transaction
+from django.middleware.csrf import get_token
+from django.utils import timezone
+from django.utils.cache import quote_etag
+from django.utils.crypto import salted_hmac
+
+VERSION_KEY = 'news:version:{news_id}'
+
+
+def get_news_version(news_id):
+    """Время последнего изменения комментариев новости в наносекундах.
+
+    Если ключа нет в кеше, версией становится текущее время: страница
+    будет отдана целиком, но устаревшей не окажется.
+    """
+    return cache.get_or_set(
+        VERSION_KEY.format(news_id=news_id), time.time_ns, None
+    )
+
+
+def _set_version(news_id):
+    cache.set(VERSION_KEY.format(news_id=news_id), time.time_ns(), None)
+
+
+def touch_news(news_id):
+    """Отмечает изменение комментариев новости.
+
+    Версия обновляется сразу и ещё раз после фиксации транзакции,
+    как и снимок главной страницы.
+    """
+    _set_version(news_id)
+    transaction.on_commit(lambda: _set_version(news_id))
+
+
+def news_validators(
+    request, news_id, news_date, last_comment, live_comments, versions
+):
+    """Валидаторы ETag и Last-Modified страницы новости.
+
+    ETag строится из даты новости, времени последнего комментария,
+    количества неудалённых комментариев и суммы их версий, поэтому
+    меняется при новых, изменённых и удалённых комментариях, даже если
+    процесс не видел записи и его версия в кеше устарела. Версия из кеша
+    тоже входит в ETag. ETag зависит от пользователя: у автора
+    комментария на странице есть ссылки на редактирование, у анонима —
+    нет формы. В форме комментария есть CSRF-токен, поэтому для
+    пользователя в ETag входит и хеш CSRF-cookie: после её смены,
+    например при повторном входе, страница отдаётся заново.
+    """
+    version = get_news_version(news_id)
+    user = request.user
+    csrf = ''
+    if user.is_authenticated:
+        # Cookie создаётся здесь, если её ещё нет, и та же попадёт в форму.
+        get_token(request)
+        csrf = salted_hmac(
+            'news.conditional', request.META['CSRF_COOKIE']
+        ).hexdigest()[:16]
+    published = timezone.make_aware(
+        datetime.combine(news_date, datetime.min.time())
+    )
+    last_comment = last_comment.timestamp() if last_comment else 0
+    last_modified = max(published.timestamp(), last_comment, version / 1e9)
+    state = (
+        f'{news_date:%Y%m%d}-{int(last_comment * 1e6)}'
+        f'-{live_comments}-{versions or 0}'
+    )
+    etag = quote_etag(
+        f'{news_id}-{state}-{version}-{user.pk or 0}-{csrf}'
+    )
+    return etag, int(last_modified)
@@ -0,0 +1,80 @@
+import csv
+import json
+from datetime import datetime, time, timedelta
+from itertools import chain, islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import ArchivedComment, Comment
+
+FIELDS = (
+    'id', 'news_id', 'news__title', 'news__date',
+    'author__username', 'text', 'created',
+)
+HEADER = (
+    'comment_id', 'news_id', 'news_title', 'news_date',
+    'author', 'text', 'created',
+)
+
+
+class _Echo:
+    """Псевдофайл для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def _start_of(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def export_rows(since=None, until=None, chunk_size=2000):
+    """Комментарии с новостью и именем автора, без создания моделей.
+
+    Сначала идут комментарии из Comment, затем из архива. Строки
+    читаются курсором порциями по chunk_size, поэтому память не зависит
+    от размера выгрузки. Даты переводятся в границы по created, чтобы
+    фильтр использовал индекс.
+    """
+    filters = {}
+    if since is not None:
+        filters['created__gte'] = _start_of(since)
+    if until is not None:
+        filters['created__lt'] = _start_of(until + timedelta(days=1))
+    return chain.from_iterable(
+        model.objects.filter(**filters).order_by('pk').values_list(
+            *FIELDS
+        ).iterator(chunk_size=chunk_size)
+        for model in (Comment, ArchivedComment)
+    )
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(HEADER)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def jsonl_lines(rows):
+    for row in rows:
+        yield json.dumps(
+            dict(zip(HEADER, row)), ensure_ascii=False, cls=DjangoJSONEncoder
+        ) + '\n'
+
+
+FORMATS = {
+    'csv': (csv_lines, 'text/csv; charset=utf-8'),
+    'jsonl': (jsonl_lines, 'application/x-ndjson; charset=utf-8'),
+}
+
+
+def export_chunks(export_format, lines_per_chunk=1000, **filters):
+    """Выгрузка в формате export_format кусками по lines_per_chunk строк."""
+    lines = FORMATS[export_format][0](export_rows(**filters))
+    while True:
+        chunk = ''.join(islice(lines, lines_per_chunk))
+        if not chunk:
+            return
+        yield chunk
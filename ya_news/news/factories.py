@@ -0,0 +1,104 @@
+"""Фабрики для массового создания данных в тестах и бенчмарках.
+
+Объекты создаются через bulk_create с явными датами, а кеши
+сбрасываются сигналами news_flushed и comments_flushed. SQLite не
+возвращает id из bulk_create, поэтому созданные объекты при fetch=True
+перечитываются одним запросом по диапазону первичных ключей.
+"""
+from datetime import date, timedelta
+from itertools import cycle, islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from .models import Comment, News
+from .signals import comments_flushed, news_flushed
+
+# Ограничивает память при создании сотен тысяч объектов.
+CHUNK_SIZE = 50_000
+
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _bulk_create(model, objs, fetch):
+    last_pk = model.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first() or 0
+    objs = iter(objs)
+    while True:
+        chunk = list(islice(objs, CHUNK_SIZE))
+        if not chunk:
+            break
+        model.objects.bulk_create(chunk)
+    if fetch:
+        return list(model.objects.filter(pk__gt=last_pk).order_by('pk'))
+
+
+def make_users(count=None, usernames=None, fetch=True):
+    """Пользователи с именами usernames или user0 … user{count - 1}.
+
+    Всем пользователям назначается один непригодный для входа пароль,
+    чтобы не считать хеш на каждого.
+    """
+    if usernames is None:
+        usernames = (f'user{index}' for index in range(count))
+    User = get_user_model()
+    password = make_password(None)
+    return _bulk_create(
+        User,
+        (User(username=name, password=password) for name in usernames),
+        fetch
+    )
+
+
+def make_news(count, start_date=None, step=timedelta(days=1), fetch=True):
+    """Новости с датами от start_date (по умолчанию сегодня) назад."""
+    if start_date is None:
+        start_date = date.today()
+    news = _bulk_create(
+        News,
+        (
+            News(
+                title=f'Новость {index}',
+                text='Текст для теста',
+                date=start_date - step * index
+            )
+            for index in range(count)
+        ),
+        fetch
+    )
+    news_flushed.send(sender=News)
+    return news
+
+
+def make_comments(
+    news, authors, count, start=None, step=timedelta(minutes=1), fetch=True
+):
+    """Комментарии с временем создания от start вперёд с шагом step.
+
+    news и authors — объект или список объектов; комментарии
+    распределяются по ним по кругу.
+    """
+    if start is None:
+        start = timezone.now()
+    pairs = zip(cycle(_as_list(news)), cycle(_as_list(authors)))
+    comments = _bulk_create(
+        Comment,
+        (
+            Comment(
+                news=news_item,
+                author=author,
+                text=f'Текст {index}',
+                created=start + step * index
+            )
+            for index, (news_item, author) in zip(range(count), pairs)
+        ),
+        fetch
+    )
+    comments_flushed.send(
+        sender=Comment, news_ids={news_item.pk for news_item in _as_list(news)}
+    )
+    return comments
@@ -1,6 +1,8 @@
+from django import forms
 from django.forms import ModelForm
 from django.core.exceptions import ValidationError
 
+from .idempotency import IdempotencyKeyField
 from .models import Comment
 
 BAD_WORDS = (
@@ -9,9 +11,40 @@ BAD_WORDS = (
     # Дополните список на своё усмотрение.
 )
 WARNING = 'Не ругайтесь!'
+CONFLICT_WARNING = (
+    'Комментарий изменили, пока вы его редактировали. Проверьте текст '
+    'и сохраните ещё раз, чтобы перезаписать изменения.'
+)
+
+
+class VersionedModelForm(ModelForm):
+    """Форма для моделей с оптимистической блокировкой.
+
+    Версия, которую видел пользователь, передаётся в скрытом поле,
+    а при сохранении обновляются только изменённые поля.
+    """
+    version = forms.IntegerField(
+        widget=forms.HiddenInput, required=False, min_value=1
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk is not None:
+            self.initial.setdefault('version', self.instance.version)
+
+    def save(self, commit=True):
+        if not commit or self.instance._state.adding:
+            return super().save(commit)
+        if self.cleaned_data.get('version'):
+            self.instance.version = self.cleaned_data['version']
+        self.instance.save(update_fields=[
+            name for name in self.changed_data if name in self._meta.fields
+        ])
+        return self.instance
 
 
-class CommentForm(ModelForm):
+class CommentForm(VersionedModelForm):
+    idempotency_key = IdempotencyKeyField()
 
     class Meta:
         model = Comment
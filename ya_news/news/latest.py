@@ -0,0 +1,107 @@
+from collections import deque, namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.text import Truncator
+
+from .models import Comment
+
+LATEST_KEY = 'news:latest_comments'
+TRUNCATE_WORDS = 10
+
+LatestComment = namedtuple(
+    'LatestComment', ('pk', 'news_id', 'news_title', 'author', 'text')
+)
+
+
+def _truncate(text):
+    return Truncator(text).words(TRUNCATE_WORDS, truncate=' …')
+
+
+def _entry(pk, news_id, news_title, author, text):
+    return LatestComment(pk, news_id, news_title, author, _truncate(text))
+
+
+def build_latest_comments():
+    """Последние комментарии сайта, от новых к старым.
+
+    Запрос идёт по индексу на created и останавливается
+    на NEWS_LATEST_COMMENTS строках.
+    """
+    size = settings.NEWS_LATEST_COMMENTS
+    rows = Comment.objects.order_by('-created', '-pk').values_list(
+        'pk', 'news_id', 'news__title', 'author__username', 'text'
+    )[:size]
+    return deque((_entry(*row) for row in rows), maxlen=size)
+
+
+def rebuild_latest_comments():
+    """Пересобирает буфер и кладёт его в кеш."""
+    latest = build_latest_comments()
+    cache.set(LATEST_KEY, latest, settings.NEWS_LATEST_COMMENTS_TIMEOUT)
+    return latest
+
+
+def get_latest_comments():
+    """Буфер последних комментариев; собирается только при промахе."""
+    latest = cache.get(LATEST_KEY)
+    if latest is None:
+        latest = rebuild_latest_comments()
+    return latest
+
+
+def push_latest_comment(comment):
+    """Добавляет новый комментарий в начало буфера после фиксации.
+
+    Буфер меняется чтением и записью кеша, поэтому при одновременных
+    комментариях из разных процессов один из них может не попасть
+    в буфер до пересборки; время жизни буфера это ограничивает.
+    """
+    entry = _entry(
+        comment.pk, comment.news_id, comment.news.title,
+        comment.author.get_username(), comment.text
+    )
+
+    def push():
+        latest = cache.get(LATEST_KEY)
+        if latest is None:
+            return
+        latest.appendleft(entry)
+        cache.set(LATEST_KEY, latest, settings.NEWS_LATEST_COMMENTS_TIMEOUT)
+
+    transaction.on_commit(push)
+
+
+def update_latest_comment(comment):
+    """Обновляет текст изменённого комментария, если он в буфере."""
+    def update():
+        latest = cache.get(LATEST_KEY)
+        if latest is None:
+            return
+        for index, entry in enumerate(latest):
+            if entry.pk == comment.pk:
+                latest[index] = entry._replace(text=_truncate(comment.text))
+                cache.set(
+                    LATEST_KEY, latest, settings.NEWS_LATEST_COMMENTS_TIMEOUT
+                )
+                return
+
+    transaction.on_commit(update)
+
+
+def schedule_latest_comments_rebuild():
+    """Сбрасывает буфер и пересобирает его после фиксации транзакции.
+
+    Нужно при удалении и пакетной записи комментариев: после удаления
+    буфер надо дополнить более старыми комментариями, а пакет может
+    содержать комментарии не по порядку. Внутри одной транзакции
+    пересборка планируется только один раз.
+    """
+    cache.delete(LATEST_KEY)
+    connection = transaction.get_connection()
+    if not any(
+        func is rebuild_latest_comments
+        for _, func in connection.run_on_commit
+    ):
+        transaction.on_commit(rebuild_latest_comments)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from news.archive import archive_comments, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = 'Переносит комментарии старых новостей в архивную таблицу.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Возраст новости в днях (по умолчанию '
+                 'NEWS_ARCHIVE_AFTER_DAYS).'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Количество комментариев в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        moved = archive_comments(
+            archive_cutoff(options['days']), options['chunk_size']
+        )
+        self.stdout.write(f'Перенесено комментариев: {moved}')
@@ -0,0 +1,41 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from news.export import FORMATS, export_chunks
+
+
+class Command(BaseCommand):
+    help = 'Выгружает комментарии с новостями и авторами в CSV или JSONL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=tuple(FORMATS), default='csv'
+        )
+        parser.add_argument(
+            '--since',
+            type=date.fromisoformat,
+            help='Комментарии не раньше этой даты (ГГГГ-ММ-ДД).'
+        )
+        parser.add_argument(
+            '--until',
+            type=date.fromisoformat,
+            help='Комментарии не позже этой даты (ГГГГ-ММ-ДД).'
+        )
+        parser.add_argument(
+            '--output', help='Файл для выгрузки, по умолчанию stdout.'
+        )
+
+    def handle(self, *args, **options):
+        chunks = export_chunks(
+            options['format'],
+            since=options['since'],
+            until=options['until']
+        )
+        if options['output'] is None:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            for chunk in chunks:
+                output.write(chunk)
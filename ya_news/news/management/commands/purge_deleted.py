@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from news.models import Comment
+from news.purge import delete_in_batches
+
+
+class Command(BaseCommand):
+    help = 'Окончательно удаляет комментарии, помеченные удалёнными.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Количество комментариев в одной транзакции.'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.05,
+            help='Пауза между транзакциями в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        purged = delete_in_batches(
+            Comment.all_objects.filter(is_deleted=True),
+            options['chunk_size'],
+            options['pause']
+        )
+        self.stdout.write(f'Удалено комментариев: {purged}')
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.15 on 2026-10-19 16:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_comment_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='is_deleted',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(
+                condition=models.Q(('is_deleted', True)),
+                fields=['id'],
+                name='news_comment_deleted_idx'
+            ),
+        ),
+    ]
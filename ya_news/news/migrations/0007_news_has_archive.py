@@ -0,0 +1,28 @@
+# Generated by Django 3.2.15 on 2026-10-19 16:25
+
+from django.db import migrations, models
+
+
+def mark_archived_news(apps, schema_editor):
+    """Отмечает новости, комментарии которых уже перенесены в архив."""
+    News = apps.get_model('news', 'News')
+    ArchivedComment = apps.get_model('news', 'ArchivedComment')
+    News.objects.filter(
+        pk__in=ArchivedComment.objects.values('news_id')
+    ).update(has_archive=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_comment_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='has_archive',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(mark_archived_news, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,17 @@
 from datetime import datetime
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.utils import timezone
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    # Есть ли у новости комментарии в ArchivedComment.
+    has_archive = models.BooleanField(default=False, editable=False)
 
     class Meta:
         ordering = ('-date',)
@@ -18,7 +22,124 @@ class News(models.Model):
         return self.title
 
 
-class Comment(models.Model):
+class EditConflict(Exception):
+    """Запись изменили после того, как её прочитали для правки."""
+
+
+class Versioned(models.Model):
+    """Оптимистическая блокировка по номеру версии.
+
+    UPDATE выполняется с условием WHERE version = n и увеличивает версию.
+    Если строку успели изменить, save() выбрасывает EditConflict;
+    дополнительный запрос делается только в этом случае, чтобы отличить
+    конфликт от удалённой строки.
+    """
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        self.version += 1
+        try:
+            # Точка сохранения не даёт конфликту испортить внешнюю
+            # транзакцию: save_base помечает её для отката при ошибке.
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except EditConflict:
+            self.version -= 1
+            raise
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields,
+                   forced_update):
+        filtered = base_qs.filter(pk=pk_val, version=self.version - 1)
+        updated = super()._do_update(
+            filtered, using, pk_val, values, update_fields, forced_update
+        )
+        if not updated and base_qs.filter(pk=pk_val).exists():
+            raise EditConflict
+        return updated
+
+
+class LiveManager(models.Manager):
+    """Менеджер, который не видит помеченные удалёнными строки."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
+class SoftDeletable(models.Model):
+    """Мягкое удаление: строка помечается и исчезает из objects.
+
+    Помеченные строки доступны через all_objects, физически их удаляет
+    команда purge_deleted небольшими транзакциями.
+    """
+    is_deleted = models.BooleanField(default=False, editable=False)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        abstract = True
+
+    def soft_delete(self, **changes):
+        """Помечает строку удалённой одним UPDATE.
+
+        Отправляет post_delete, чтобы кеши сбросились так же,
+        как при настоящем удалении.
+        """
+        type(self).all_objects.filter(pk=self.pk).update(
+            is_deleted=True, **changes
+        )
+        self.is_deleted = True
+        post_delete.send(
+            sender=type(self), instance=self, using=self._state.db
+        )
+
+
+class Comment(Versioned, SoftDeletable):
+    news = models.ForeignKey(
+        News,
+        on_delete=models.CASCADE
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+    text = models.TextField()
+    # Не auto_now_add: время можно задать явно, например при bulk_create.
+    # Индекс нужен выборке последних комментариев сайта.
+    created = models.DateTimeField(
+        default=timezone.now, editable=False, db_index=True
+    )
+
+    is_archived = False
+
+    class Meta:
+        ordering = ('created',)
+        indexes = (
+            # Небольшой частичный индекс для поиска строк под удаление.
+            models.Index(
+                fields=('id',),
+                condition=models.Q(is_deleted=True),
+                name='news_comment_deleted_idx'
+            ),
+        )
+
+    def __str__(self):
+        return self.text[:50]
+
+
+class ArchivedComment(models.Model):
+    """Комментарий к старой новости, перенесённый из Comment.
+
+    Первичный ключ совпадает с id исходного комментария.
+    """
+    id = models.BigIntegerField(primary_key=True)
     news = models.ForeignKey(
         News,
         on_delete=models.CASCADE
@@ -28,10 +149,43 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
     )
     text = models.TextField()
-    created = models.DateTimeField(auto_now_add=True)
+    created = models.DateTimeField()
+
+    is_archived = True
 
     class Meta:
         ordering = ('created',)
 
     def __str__(self):
         return self.text[:50]
+
+
+def _count(queryset):
+    """Скалярный подзапрос COUNT(*) по строкам новости из внешнего запроса.
+
+    Без GROUP BY подзапрос всегда возвращает одну строку, в том числе 0.
+    """
+    return models.Subquery(
+        queryset.filter(news=models.OuterRef('pk')).order_by().annotate(
+            count=models.Func(models.F('pk'), function='COUNT')
+        ).values('count'),
+        output_field=models.IntegerField()
+    )
+
+
+def with_comment_count(queryset):
+    """Добавляет к новостям comment_count вместе с архивными.
+
+    Оба количества считаются скалярными подзапросами по индексу news_id,
+    без соединения с комментариями и GROUP BY во внешнем запросе.
+    Архив считается только для новостей с has_archive.
+    """
+    return queryset.annotate(comment_count=_count(
+        Comment.objects.all()
+    ) + models.Case(
+        models.When(
+            has_archive=True, then=_count(ArchivedComment.objects.all())
+        ),
+        default=0,
+        output_field=models.IntegerField()
+    ))
@@ -0,0 +1,60 @@
+import time
+
+from django.db import transaction
+
+from .models import ArchivedComment, Comment
+from .signals import comments_flushed
+
+
+def delete_in_batches(queryset, chunk_size=1000, pause=0):
+    """Удаляет строки queryset порциями по chunk_size.
+
+    Каждая порция удаляется своей транзакцией одним DELETE без сигналов
+    и каскадов, так что SQLite не блокируется на всё удаление, а между
+    порциями можно сделать паузу в pause секунд. Подходит только для
+    моделей, на которые никто не ссылается. Возвращает количество
+    удалённых строк.
+    """
+    model = queryset.model
+    # Порядок не нужен: удалённые строки в следующую порцию не попадут,
+    # а без сортировки LIMIT останавливается на первых найденных строках.
+    pks = queryset.order_by().values_list('pk', flat=True)
+    deleted = 0
+    while True:
+        with transaction.atomic(using=queryset.db):
+            batch = list(pks[:chunk_size])
+            if batch:
+                deleted += model._base_manager.using(queryset.db).filter(
+                    pk__in=batch
+                )._raw_delete(queryset.db)
+        if len(batch) < chunk_size:
+            return deleted
+        if pause:
+            time.sleep(pause)
+
+
+def delete_users(users, chunk_size=1000, pause=0):
+    """Удаляет пользователей queryset users вместе с комментариями.
+
+    Комментарии и архивные комментарии удаляются порциями через
+    delete_in_batches, поэтому память и время блокировки не зависят
+    от их количества, а сами пользователи — обычным delete() уже без
+    тяжёлого каскада. Возвращает количество удалённых комментариев.
+    """
+    user_ids = list(users.values_list('pk', flat=True))
+    querysets = [
+        model._base_manager.filter(author_id__in=user_ids)
+        for model in (Comment, ArchivedComment)
+    ]
+    news_ids = set()
+    for queryset in querysets:
+        news_ids.update(
+            queryset.order_by().values_list('news_id', flat=True).distinct()
+        )
+    deleted = sum(
+        delete_in_batches(queryset, chunk_size, pause)
+        for queryset in querysets
+    )
+    users.model._base_manager.filter(pk__in=user_ids).delete()
+    comments_flushed.send(sender=Comment, news_ids=news_ids)
+    return deleted
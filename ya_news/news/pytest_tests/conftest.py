@@ -2,9 +2,11 @@ from datetime import datetime, timedelta
 import pytest
 
 from django.conf import settings
+from django.core.cache import cache
 from django.test.client import Client
-from django.utils import timezone
 
+from news import ratelimit
+from news.factories import make_comments, make_news
 from news.models import News, Comment
 from news.forms import BAD_WORDS
 
@@ -34,7 +36,7 @@ def reader_client(reader):
 
 
 @pytest.fixture
-def news():
+def news(db):
     news = News.objects.create(
         title='Заголовок',
         text='Текст'
@@ -63,31 +65,33 @@ def pk_comment_for_args(comment):
 
 
 @pytest.fixture
-def news_list():
-    today = datetime.today()
-    news = News.objects.bulk_create(
-        News(
-            title=f'Новость {index}',
-            text='Текст для теста',
-            date=today - timedelta(days=index)
-        )
-        for index in range(settings.NEWS_COUNT_ON_HOME_PAGE + 1)
-    )
-    return news
+def news_list(db):
+    return make_news(settings.NEWS_COUNT_ON_HOME_PAGE + 1)
 
 
 @pytest.fixture
 def comment_list(news, author):
-    now = timezone.now()
-    for index in range(10):
-        comment = Comment.objects.create(
-            news=news,
-            author=author,
-            text=f'Текст {index}'
+    return make_comments(news, author, 10, step=timedelta(days=1))
+
+
+@pytest.fixture
+def old_news(db, settings):
+    return News.objects.create(
+        title='Старая новость',
+        text='Текст',
+        date=datetime.today() - timedelta(
+            days=settings.NEWS_ARCHIVE_AFTER_DAYS + 1
         )
-        comment.created = now + timedelta(days=index)
-        comment.save()
-    return comment
+    )
+
+
+@pytest.fixture
+def old_comment(old_news, author):
+    return Comment.objects.create(
+        news=old_news,
+        author=author,
+        text='Старый комментарий'
+    )
 
 
 @pytest.fixture
@@ -105,14 +109,20 @@ def bad_form_comment():
 
 
 @pytest.fixture
-def delete_comments():
+def delete_comments(db):
     Comment.objects.all().delete()
 
 
 @pytest.fixture(autouse=True)
-def enable_db_access_for_all_tests(db):
-    pass
+def reset_shared_state():
+    """Кеш и лимиты запросов не должны переживать тест."""
+    cache.clear()
+    ratelimit.reset()
 
 
 def pytest_make_parametrize_id(val):
+    # repr клиента содержит адрес в памяти, а у воркеров pytest-xdist
+    # идентификаторы тестов должны совпадать.
+    if isinstance(val, Client):
+        return 'Client()'
     return repr(val)
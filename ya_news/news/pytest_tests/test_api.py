@@ -0,0 +1,122 @@
+from http import HTTPStatus
+import pytest
+
+from django.test.client import Client
+from django.urls import reverse
+
+from news.forms import WARNING
+from news.models import Comment
+
+
+def test_api_news_pages_cover_all_news(client, news_list):
+    """Проверка постраничной выдачи новостей.
+
+    Страницы по курсору выдают все новости от новых к старым без
+    повторов и только с запрошенными полями.
+    """
+    url = reverse('news:api_news_list')
+    params = {'fields': 'title,date', 'limit': 3}
+    results = []
+    while True:
+        page = client.get(url, params).json()
+        results += page['results']
+        if page['next'] is None:
+            break
+        params['after'] = page['next']
+    dates = [item['date'] for item in results]
+    assert (
+        len(results) == len(news_list)
+        and dates == sorted(dates, reverse=True)
+        and all(set(item) == {'title', 'date'} for item in results)
+    ), 'Выдача новостей по страницам неполная или неупорядоченная.'
+
+
+def test_api_bad_parameters(client):
+    """Проверка ошибок в параметрах запроса."""
+    url = reverse('news:api_news_list')
+    for params in ({'fields': 'password'}, {'after': 'xyz'}, {'limit': 0}):
+        response = client.get(url, params)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Неверные параметры {params} не отклоняются.'
+        )
+
+
+def test_api_response_is_gzipped(client, news_list):
+    """Проверка сжатия ответов API."""
+    response = client.get(
+        reverse('news:api_news_list'), HTTP_ACCEPT_ENCODING='gzip'
+    )
+    assert response['Content-Encoding'] == 'gzip', 'Ответ API не сжат.'
+
+
+@pytest.mark.parametrize(
+    'parametrized_client, data, status',
+    (
+        (
+            pytest.lazy_fixture('author_client'),
+            pytest.lazy_fixture('form_comment'),
+            HTTPStatus.CREATED
+        ),
+        (
+            pytest.lazy_fixture('author_client'),
+            pytest.lazy_fixture('bad_form_comment'),
+            HTTPStatus.BAD_REQUEST
+        ),
+        (
+            Client(),
+            pytest.lazy_fixture('form_comment'),
+            HTTPStatus.UNAUTHORIZED
+        ),
+    )
+)
+def test_api_create_comment(parametrized_client, data, status, news):
+    """Проверка создания комментария через API.
+
+    Комментарий проходит ту же валидацию, что и форма на странице,
+    а аноним комментировать не может.
+    """
+    response = parametrized_client.post(
+        reverse('news:api_news_comments', args=(news.pk,)),
+        data,
+        content_type='application/json'
+    )
+    assert response.status_code == status
+    assert Comment.objects.count() == (status == HTTPStatus.CREATED)
+    if status == HTTPStatus.BAD_REQUEST:
+        assert response.json()['errors'] == {'text': [WARNING]}
+
+
+@pytest.mark.parametrize(
+    'parametrized_client, status',
+    (
+        (pytest.lazy_fixture('author_client'), HTTPStatus.OK),
+        (pytest.lazy_fixture('reader_client'), HTTPStatus.NOT_FOUND),
+        (Client(), HTTPStatus.UNAUTHORIZED),
+    )
+)
+def test_api_edit_comment(parametrized_client, status, comment, form_comment):
+    """Проверка правки комментария через API.
+
+    Изменить комментарий может только его автор.
+    """
+    response = parametrized_client.patch(
+        reverse('news:api_comment', args=(comment.pk,)),
+        form_comment,
+        content_type='application/json'
+    )
+    comment.refresh_from_db()
+    assert response.status_code == status
+    assert (comment.text == form_comment['text']) is (
+        status == HTTPStatus.OK
+    ), 'Комментарий изменён не автором или не изменён автором.'
+
+
+def test_api_delete_comment(author_client, comment):
+    """Проверка удаления комментария автором через API."""
+    response = author_client.delete(
+        reverse('news:api_comment', args=(comment.pk,))
+    )
+    assert (
+        response.status_code == HTTPStatus.NO_CONTENT
+        and not Comment.objects.exists()
+    ), 'Автор не смог удалить комментарий через API.'
@@ -1,8 +1,21 @@
+import json
+from datetime import date, timedelta
+from http import HTTPStatus
+from io import StringIO
 import pytest
 
 from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from news.admin import CommentInline
+from news.conditional import VERSION_KEY
+from news.latest import LATEST_KEY
+from news.models import Comment
+
 
 def test_news_count_and_order(client, news_list):
     """Проверка кол-ва новостей на главной странице и их сортировка.
@@ -13,7 +26,7 @@ def test_news_count_and_order(client, news_list):
     url = reverse('news:home')
     response = client.get(url)
     object_list = response.context['object_list']
-    news_count = object_list.count()
+    news_count = len(object_list)
     all_dates = [news.date for news in object_list]
     sorted_dates = sorted(all_dates, reverse=True)
     assert (
@@ -61,3 +74,254 @@ def test_comment_order(client, comment_list, pk_news_for_args):
     all_dates = [comment.created for comment in all_comments]
     sorted_dates = sorted(all_dates)
     assert all_dates == sorted_dates, 'Комментарии отсортированы некорректно'
+
+
+def test_admin_comment_inline_is_paginated(
+    admin_client, news, author, django_assert_max_num_queries
+):
+    """Проверка постраничного вывода комментариев в админке.
+
+    Страница новости с большим обсуждением выводит только одну страницу
+    комментариев и не делает запросов на каждый комментарий.
+    """
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Текст {index}')
+        for index in range(CommentInline.per_page + 10)
+    )
+    url = reverse('admin:news_news_change', args=(news.pk,))
+    with django_assert_max_num_queries(10):
+        response = admin_client.get(url)
+    formset = response.context['inline_admin_formsets'][0].formset
+    assert len(formset.forms) == CommentInline.per_page, (
+        'В админке выводятся все комментарии новости.'
+    )
+    assert formset.max_num == 0, (
+        'В админке можно добавить комментарий без автора.'
+    )
+
+
+def test_archived_comments_on_old_news(client, old_news, old_comment):
+    """Проверка вывода архивных комментариев.
+
+    На странице старой новости выводятся и комментарии из архива.
+    """
+    call_command('archive_comments', stdout=StringIO())
+    url = reverse('news:detail', args=(old_news.pk,))
+    response = client.get(url)
+    texts = [comment.text for comment in response.context['comments']]
+    assert texts == [old_comment.text], (
+        'Архивные комментарии не выводятся на странице старой новости.'
+    )
+
+
+def test_archived_comments_with_custom_days(client, old_news, old_comment):
+    """Проверка архивных комментариев при переносе с ключом --days.
+
+    Комментарии новости, перенесённые раньше NEWS_ARCHIVE_AFTER_DAYS,
+    по-прежнему выводятся на её странице и в API.
+    """
+    old_news.date = date.today() - timedelta(days=40)
+    old_news.save()
+    call_command('archive_comments', days=30, stdout=StringIO())
+    response = client.get(reverse('news:detail', args=(old_news.pk,)))
+    assert [comment.text for comment in response.context['comments']] == [
+        old_comment.text
+    ], 'Перенесённые в архив комментарии пропали со страницы новости.'
+    response = client.get(reverse(
+        'news:api_news_comments', args=(old_news.pk,)
+    ))
+    assert [
+        comment['text'] for comment in response.json()['results']
+    ] == [old_comment.text]
+
+
+def test_home_snapshot(client, news, author, django_assert_num_queries):
+    """Проверка снимка главной страницы.
+
+    Повторный запрос главной не обращается к БД, а новый комментарий
+    сразу отражается в количестве комментариев.
+    """
+    url = reverse('news:home')
+    client.get(url)
+    with django_assert_num_queries(0):
+        client.get(url)
+    Comment.objects.create(news=news, author=author, text='Текст')
+    response = client.get(url)
+    assert response.context['object_list'][0].comment_count == 1, (
+        'Снимок главной страницы не обновился после комментария.'
+    )
+
+
+def test_comment_count_includes_archive(client, old_news, old_comment, author):
+    """Проверка количества комментариев после переноса в архив.
+
+    На главной и в API учитываются и архивные, и новые комментарии.
+    """
+    call_command('archive_comments', stdout=StringIO())
+    Comment.objects.create(news=old_news, author=author, text='Новый')
+    cache.clear()
+    response = client.get(reverse('news:home'))
+    assert response.context['object_list'][0].comment_count == 2, (
+        'Архивные комментарии не учитываются на главной странице.'
+    )
+    response = client.get(
+        reverse('news:api_news_list'), {'fields': 'comment_count'}
+    )
+    assert response.json()['results'] == [{'comment_count': 2}]
+
+
+@pytest.mark.parametrize('export_format', ('csv', 'jsonl'))
+def test_export_comments(admin_client, comment, export_format):
+    """Проверка выгрузки комментариев.
+
+    Выгрузка содержит комментарий, его новость и имя автора.
+    """
+    response = admin_client.get(
+        reverse('news:export'), {'format': export_format}
+    )
+    content = b''.join(response.streaming_content).decode()
+    for value in (comment.text, comment.news.title, comment.author.username):
+        assert value in content, 'В выгрузке нет данных комментария.'
+
+
+def test_export_includes_archive_within_dates(
+    admin_client, comment, old_comment
+):
+    """Проверка выгрузки архивных комментариев и фильтра по датам.
+
+    Архивные комментарии попадают в выгрузку, а since и until
+    включают комментарии за весь указанный день.
+    """
+    call_command('archive_comments', stdout=StringIO())
+    today = date.today()
+    for since, until, expected in (
+        (today, today, [comment.pk, old_comment.pk]),
+        (today - timedelta(days=1), today - timedelta(days=1), []),
+    ):
+        response = admin_client.get(reverse('news:export'), {
+            'format': 'jsonl',
+            'since': since.isoformat(),
+            'until': until.isoformat(),
+        })
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert [json.loads(line)['comment_id'] for line in lines] == expected
+
+
+def test_news_detail_not_modified(author_client, comment, pk_news_for_args):
+    """Проверка условных запросов к странице новости.
+
+    Неизменившаяся страница отдаётся как 304 без рендеринга шаблона,
+    а правка комментария делает прежний ETag недействительным.
+    """
+    url = reverse('news:detail', args=pk_news_for_args)
+    etag = author_client.get(url)['ETag']
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert (
+        response.status_code == HTTPStatus.NOT_MODIFIED
+        and not response.templates
+    ), 'Неизменившаяся страница новости рендерится заново.'
+    comment.text = 'Новый текст'
+    comment.save()
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        'После правки комментария страница новости не обновилась.'
+    )
+
+
+def test_news_detail_etag_without_cache_version(
+    client, news, comment, pk_news_for_args
+):
+    """Проверка ETag страницы новости на процессе без свежей версии.
+
+    Новый и удалённый комментарии меняют ETag, даже если версия
+    новости в кеше процесса осталась прежней.
+    """
+    url = reverse('news:detail', args=pk_news_for_args)
+    etag = client.get(url)['ETag']
+    version_key = VERSION_KEY.format(news_id=news.pk)
+    stale_version = cache.get(version_key)
+    for change in (
+        lambda: Comment.objects.create(
+            news=news, author=comment.author, text='Новый'
+        ),
+        comment.soft_delete,
+    ):
+        change()
+        cache.set(version_key, stale_version, None)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Процесс с устаревшей версией в кеше отдал 304.'
+        )
+        etag = response['ETag']
+
+
+def test_news_detail_etag_follows_csrf_cookie(
+    author_client, pk_news_for_args
+):
+    """Проверка ETag страницы новости с формой комментария.
+
+    После смены CSRF-cookie прежний ETag недействителен, и страница
+    с формой отдаётся заново с новым токеном.
+    """
+    url = reverse('news:detail', args=pk_news_for_args)
+    etag = author_client.get(url)['ETag']
+    del author_client.cookies[settings.CSRF_COOKIE_NAME]
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        'После смены CSRF-cookie отдана страница со старым токеном.'
+    )
+
+
+def test_comment_authors_load_only_username(
+    author_client, comment, pk_news_for_args, pk_comment_for_args
+):
+    """Проверка загрузки авторов комментариев.
+
+    Из таблицы пользователей для комментариев читаются только id
+    и имя, а ссылки на правку видит автор комментария.
+    """
+    url = reverse('news:detail', args=pk_news_for_args)
+    with CaptureQueriesContext(connection) as context:
+        response = author_client.get(url)
+    comment_queries = [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT "news_comment"')
+    ]
+    assert len(comment_queries) == 1
+    assert '"auth_user"."password"' not in comment_queries[0], (
+        'Для комментариев загружаются лишние поля пользователей.'
+    )
+    assert reverse('news:edit', args=pk_comment_for_args) in (
+        response.content.decode()
+    ), 'Автор не видит ссылку на правку своего комментария.'
+
+
+def test_latest_comments_on_home(
+    client, news, author, django_assert_num_queries,
+    django_capture_on_commit_callbacks
+):
+    """Проверка последних комментариев на главной.
+
+    Новый комментарий попадает в буфер без пересборки, главная
+    выводится без запросов к БД, а удалённый комментарий пропадает.
+    """
+    url = reverse('news:home')
+    client.get(url)
+    with django_capture_on_commit_callbacks(execute=True):
+        comment = Comment.objects.create(
+            news=news, author=author, text='Свежий комментарий'
+        )
+    latest = cache.get(LATEST_KEY)
+    assert latest is not None and latest[0].pk == comment.pk, (
+        'Новый комментарий не добавлен в буфер последних.'
+    )
+    client.get(url)
+    with django_assert_num_queries(0):
+        response = client.get(url)
+    assert response.context['latest_comments'][0].author == author.username
+    with django_capture_on_commit_callbacks(execute=True):
+        comment.soft_delete()
+    response = client.get(url)
+    assert comment.pk not in [
+        entry.pk for entry in response.context['latest_comments']
+    ], 'Удалённый комментарий остался среди последних.'
@@ -1,12 +1,22 @@
+import json
+import os
 from http import HTTPStatus
+from io import StringIO
+from unittest.mock import Mock
 import pytest
-from pytest_django.asserts import assertFormError
+from pytest_django.asserts import assertFormError, assertRedirects
 
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.db.models.signals import post_delete
 from django.urls import reverse
 from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
 
-from news.models import Comment
+from news import write_behind
+from news.models import ArchivedComment, Comment, News
 from news.forms import WARNING
+from news.write_behind import CommentWriter
 
 
 @pytest.mark.parametrize(
@@ -119,3 +129,255 @@ def test_bad_word_in_comment(
     assert Comment.objects.count() == 0, (
         'Пользователь смог написать недопустимое слово в комментарии'
     )
+
+
+@pytest.fixture
+def comment_writer(settings, tmp_path, monkeypatch):
+    settings.NEWS_COMMENT_WRITE_BEHIND = True
+    writer = CommentWriter(tmp_path, batch_size=100, flush_interval=1)
+    monkeypatch.setattr(write_behind, '_writer', writer)
+    return writer
+
+
+def test_write_behind_comment(
+    author_client, form_comment, pk_news_for_args, comment_writer
+):
+    """Проверка отложенной записи комментария.
+
+    Пользователь сразу возвращается к комментариям, а комментарий
+    появляется в БД после сброса очереди.
+    """
+    url = reverse('news:detail', args=pk_news_for_args)
+    response = author_client.post(url, form_comment)
+    assertRedirects(response, f'{url}#comments')
+    assert Comment.objects.count() == 0, (
+        'В режиме отложенной записи комментарий сохранён сразу.'
+    )
+    assert comment_writer.flush() == 1
+    assert Comment.objects.get().text == form_comment['text']
+
+
+def test_write_behind_recovers_spill(
+    author_client, form_comment, pk_news_for_args, comment_writer,
+    monkeypatch
+):
+    """Проверка восстановления комментариев из spill-файла.
+
+    Комментарии, которые не удалось записать, сохраняются при
+    восстановлении.
+    """
+    url = reverse('news:detail', args=pk_news_for_args)
+    author_client.post(url, form_comment)
+    with monkeypatch.context() as patch:
+        patch.setattr(
+            Comment.objects, 'bulk_create', Mock(side_effect=DatabaseError)
+        )
+        assert comment_writer.flush() == 0
+    assert Comment.objects.count() == 0
+    assert comment_writer.recover() == 1
+    assert Comment.objects.count() == 1, (
+        'Комментарий из spill-файла не восстановлен.'
+    )
+
+
+def test_write_behind_recovers_spill_of_reused_pid(
+    author, news, comment_writer, tmp_path
+):
+    """Проверка восстановления spill-файла процесса с тем же pid.
+
+    Файл упавшего процесса, чей pid достался текущему, восстанавливается,
+    а посторонние файлы в каталоге пропускаются.
+    """
+    record = {
+        'news_id': news.pk,
+        'author_id': author.pk,
+        'text': 'Комментарий упавшего процесса',
+        'created': '2022-01-01T00:00:00+00:00',
+    }
+    leftover = tmp_path / f'comments-{os.getpid()}-0123abcd.jsonl'
+    leftover.write_text(json.dumps(record) + '\n', encoding='utf-8')
+    (tmp_path / 'comments-readme.txt').write_text('', encoding='utf-8')
+    comment_writer.put(news.pk, author.pk, 'Новый комментарий')
+    assert comment_writer.flush() == 1
+    assert comment_writer.recover() == 1
+    assert not leftover.exists()
+    assert Comment.objects.count() == 2, (
+        'Комментарии упавшего процесса с тем же pid потеряны.'
+    )
+
+
+def test_write_behind_rejects_comments_of_deleted_news(
+    transactional_db, author, news, old_news, comment_writer, tmp_path
+):
+    """Проверка пакета с комментарием к удалённой новости.
+
+    Комментарий к удалённой новости откладывается в .rejected-файл,
+    остальные комментарии пакета сохраняются.
+    """
+    comment_writer.put(news.pk, author.pk, 'Сохранится')
+    comment_writer.put(old_news.pk, author.pk, 'Новость удалена')
+    old_news.delete()
+    assert comment_writer.flush() == 1
+    assert list(Comment.objects.values_list('text', flat=True)) == [
+        'Сохранится'
+    ]
+    assert [path.suffix for path in tmp_path.iterdir()] == ['.rejected']
+    assert comment_writer.recover() == 0
+
+
+def test_comment_flood_is_limited(
+    author_client, form_comment, pk_news_for_args, settings
+):
+    """Проверка ограничения частоты комментариев.
+
+    Сверх допустимого количества подряд пользователь получает 429,
+    а лишние комментарии не сохраняются.
+    """
+    settings.RATELIMIT_BURST = 2
+    url = reverse('news:detail', args=pk_news_for_args)
+    statuses = [
+        author_client.post(url, form_comment).status_code for _ in range(3)
+    ]
+    assert statuses == [
+        HTTPStatus.FOUND, HTTPStatus.FOUND, HTTPStatus.TOO_MANY_REQUESTS
+    ]
+    assert Comment.objects.count() == 2, (
+        'Комментарий сохранён сверх ограничения частоты.'
+    )
+
+
+def test_archive_comments_command(comment, old_comment):
+    """Проверка переноса комментариев старых новостей в архив.
+
+    Комментарии старых новостей переносятся в архивную таблицу,
+    комментарии свежих новостей остаются на месте. Строки удаляются
+    без post_delete на каждую.
+    """
+    on_delete = Mock()
+    post_delete.connect(on_delete, sender=Comment)
+    try:
+        call_command('archive_comments', chunk_size=1, stdout=StringIO())
+    finally:
+        post_delete.disconnect(on_delete, sender=Comment)
+    on_delete.assert_not_called()
+    assert list(Comment.objects.all()) == [comment], (
+        'Комментарии свежих новостей не должны попадать в архив.'
+    )
+    archived = ArchivedComment.objects.get()
+    assert (archived.pk, archived.text) == (old_comment.pk, old_comment.text)
+
+
+def test_concurrent_edit_is_rejected(
+    author_client, comment, pk_comment_for_args, form_comment
+):
+    """Проверка оптимистической блокировки комментария.
+
+    Правка по устаревшей версии не перезаписывает чужие изменения,
+    а возвращает форму с ошибкой и кодом 409. UPDATE затрагивает
+    только изменённые поля.
+    """
+    url = reverse('news:edit', args=pk_comment_for_args)
+    stale_version = comment.version
+    with CaptureQueriesContext(connection) as context:
+        author_client.post(
+            url, {**form_comment, 'version': stale_version}
+        )
+    updates = [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('UPDATE "news_comment"')
+    ]
+    assert len(updates) == 1 and '"news_id"' not in updates[0], (
+        'UPDATE переписывает неизменённые поля комментария.'
+    )
+    response = author_client.post(
+        url, {'text': 'Устаревшая правка', 'version': stale_version}
+    )
+    comment.refresh_from_db()
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert comment.text == form_comment['text'], (
+        'Правка по устаревшей версии перезаписала комментарий.'
+    )
+    assert response.context['form']['version'].value() == comment.version
+
+
+def test_double_submit_creates_one_comment(
+    author_client, pk_news_for_args, form_comment
+):
+    """Проверка повторной отправки формы комментария.
+
+    Вторая отправка с тем же ключом перенаправляется туда же, куда
+    и первая, без запросов на запись и без второго комментария.
+    """
+    url = reverse('news:detail', args=pk_news_for_args)
+    key = author_client.get(url).context['form']['idempotency_key'].value()
+    data = {**form_comment, 'idempotency_key': key}
+    first = author_client.post(url, data)
+    with CaptureQueriesContext(connection) as context:
+        second = author_client.post(url, data)
+    assert Comment.objects.count() == 1, 'Повторная отправка создала дубль.'
+    assertRedirects(second, first.url)
+    assert not any(
+        query['sql'].startswith(('INSERT', 'UPDATE'))
+        for query in context.captured_queries
+    ), 'Повторная отправка обращается к БД на запись.'
+
+
+def test_deleted_comment_is_hidden_until_purged(
+    author_client, comment, pk_comment_for_args
+):
+    """Проверка мягкого удаления комментария.
+
+    Удалённый комментарий пропадает из objects сразу, а из таблицы —
+    только после команды purge_deleted.
+    """
+    author_client.post(reverse('news:delete', args=pk_comment_for_args))
+    assert not Comment.objects.exists()
+    assert Comment.all_objects.get().is_deleted, (
+        'Комментарий удалён из таблицы прямо в запросе.'
+    )
+    call_command('purge_deleted', '--pause=0', stdout=StringIO())
+    assert not Comment.all_objects.exists(), (
+        'Команда purge_deleted не удалила помеченный комментарий.'
+    )
+
+
+def test_admin_deletes_news_with_comments(admin_client, news, comment_list):
+    """Проверка удаления новости с комментариями в админке."""
+    comment_list[0].soft_delete()
+    admin_client.post(
+        reverse('admin:news_news_delete', args=(news.pk,)), {'post': 'yes'}
+    )
+    assert not News.objects.filter(pk=news.pk).exists()
+    assert not Comment.all_objects.filter(news_id=news.pk).exists(), (
+        'Комментарии удалённой новости остались в таблице.'
+    )
+
+
+def test_admin_deletes_user_with_comments(admin_client, author, comment_list):
+    """Проверка удаления пользователя с комментариями в админке.
+
+    Страница подтверждения показывает количество комментариев,
+    после подтверждения удаляются и пользователь, и комментарии.
+    """
+    url = reverse('admin:auth_user_changelist')
+    data = {'action': 'delete_with_comments', '_selected_action': author.pk}
+    response = admin_client.post(url, data)
+    assert response.context['comment_count'] == len(comment_list)
+    admin_client.post(url, {**data, 'post': 'yes'})
+    assert not Comment.all_objects.filter(author_id=author.pk).exists()
+    assert not type(author).objects.filter(pk=author.pk).exists()
+
+
+def test_delete_users_command_deletes_in_batches(author, comment_list):
+    """Проверка порционного удаления комментариев пользователя."""
+    with CaptureQueriesContext(connection) as context:
+        call_command(
+            'delete_users', author.username, '--chunk-size=3', '--pause=0',
+            stdout=StringIO()
+        )
+    deletes = [
+        query for query in context.captured_queries
+        if query['sql'].startswith('DELETE FROM "news_comment"')
+    ]
+    assert len(deletes) == 4, 'Комментарии удаляются не порциями.'
+    assert not Comment.all_objects.filter(author_id=author.pk).exists()
@@ -0,0 +1,55 @@
+import re
+from http import HTTPStatus
+
+from django.urls import reverse
+
+SAMPLE = re.compile(r'^(?P<name>\w+)(?P<labels>\{.*\})? (?P<value>\S+)$')
+
+
+def scrape(client):
+    response = client.get(reverse('metrics'))
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    samples = {}
+    for line in response.content.decode().splitlines():
+        if line.startswith('#'):
+            continue
+        match = SAMPLE.match(line)
+        assert match, f'Строка не в формате Prometheus: {line}'
+        samples[match['name'] + (match['labels'] or '')] = float(
+            match['value']
+        )
+    return samples
+
+
+def test_metrics_scrape(client, news):
+    """Проверка сбора метрик по маршрутам.
+
+    После запросов к главной и странице новости в метриках растут
+    счётчики ответов, запросов к БД, отрисовок шаблонов и чтений кеша.
+    """
+    before = scrape(client)
+    client.get(reverse('news:home'))
+    client.get(reverse('news:detail', args=(news.pk,)))
+    after = scrape(client)
+
+    def grew(sample, by=1):
+        return after.get(sample, 0) - before.get(sample, 0) >= by
+
+    for view in ('news:home', 'news:detail'):
+        label = f'{{view="{view}"}}'
+        assert grew(f'django_request_duration_seconds_count{label}')
+        assert grew(
+            f'django_request_duration_seconds_bucket'
+            f'{{view="{view}",le="+Inf"}}'
+        )
+        assert grew(f'django_template_render_seconds_count{label}')
+    assert grew('django_db_queries_total{view="news:detail"}')
+    assert grew(
+        'django_cache_requests_total{view="news:home",result="hit"}'
+    ) or grew('django_cache_requests_total{view="news:home",result="miss"}')
+
+
+def test_metrics_are_private(client):
+    """Метрики недоступны с адресов не из METRICS_ALLOWED_IPS."""
+    response = client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.1')
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from io import StringIO
+import pytest
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from news.factories import make_comments, make_news
+from news.models import News, with_comment_count
+
+DATASET_SIZES = (1, 10, 50)
+
+
+@pytest.mark.parametrize(
+    'user',
+    (None, pytest.lazy_fixture('author'), pytest.lazy_fixture('reader'))
+)
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('news:home', None),
+        ('news:detail', pytest.lazy_fixture('pk_news_for_args')),
+        ('news:edit', pytest.lazy_fixture('pk_comment_for_args')),
+        ('news:delete', pytest.lazy_fixture('pk_comment_for_args')),
+        ('news:export', None),
+        ('news:api_news_list', None),
+        ('news:api_news_detail', pytest.lazy_fixture('pk_news_for_args')),
+        ('news:api_news_comments', pytest.lazy_fixture('pk_news_for_args')),
+        ('news:api_comment', pytest.lazy_fixture('pk_comment_for_args')),
+        ('users:login', None),
+        ('users:logout', None),
+        ('users:signup', None),
+    )
+)
+def test_query_count_does_not_grow(user, name, args, news, comment, reader):
+    """Проверка количества запросов к БД на разных объёмах данных.
+
+    Число запросов на странице не должно зависеть от количества
+    новостей и комментариев. Каждый замер делается с пустым кешем,
+    чтобы N+1 в шаблонах и представлениях не прятался за кешем.
+    """
+    url = reverse(name, args=args)
+    query_counts = []
+    for size in DATASET_SIZES:
+        make_news(size, start_date=news.date - timedelta(days=1))
+        make_comments(news, [comment.author, reader], size)
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            client.get(url)
+        query_counts.append(len(context))
+    assert len(set(query_counts)) == 1, (
+        f'Число запросов на {name} растёт вместе с данными: {query_counts}'
+    )
+
+
+def test_comment_count_has_no_join(comment, old_news, old_comment):
+    """Проверка запроса количества комментариев.
+
+    Живые и архивные комментарии считаются скалярными подзапросами,
+    а не соединением новостей со всеми комментариями.
+    """
+    call_command('archive_comments', stdout=StringIO())
+    with CaptureQueriesContext(connection) as context:
+        counts = dict(
+            with_comment_count(News.objects.all()).values_list(
+                'pk', 'comment_count'
+            )
+        )
+    assert counts == {comment.news_id: 1, old_news.pk: 1}
+    sql = context.captured_queries[0]['sql']
+    assert 'JOIN' not in sql and 'GROUP BY' not in sql, (
+        'Количество комментариев считается через соединение таблиц.'
+    )
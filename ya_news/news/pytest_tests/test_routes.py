@@ -8,7 +8,7 @@ from django.urls import reverse
 @pytest.mark.parametrize(
     'name, args',
     (
-        ('news:home', None),
+        pytest.param('news:home', None, marks=pytest.mark.django_db),
         ('news:detail', pytest.lazy_fixture('pk_news_for_args')),
         ('users:login', None),
         ('users:logout', None),
@@ -83,3 +83,21 @@ def test_comment_edit_delete_for_different_users(
     url = reverse(name, args=pk_comment_for_args)
     response = parametrized_client.get(url)
     assert response.status_code == expected_status, msg
+
+
+@pytest.mark.parametrize(
+    'parametrized_client, expected_status',
+    (
+        (pytest.lazy_fixture('admin_client'), HTTPStatus.OK),
+        (pytest.lazy_fixture('author_client'), HTTPStatus.FORBIDDEN),
+    )
+)
+def test_export_only_for_staff(parametrized_client, expected_status):
+    """Проверка доступа к выгрузке комментариев.
+
+    Выгрузка доступна только сотрудникам.
+    """
+    response = parametrized_client.get(reverse('news:export'))
+    assert response.status_code == expected_status, (
+        'Выгрузка комментариев доступна не только сотрудникам.'
+    )
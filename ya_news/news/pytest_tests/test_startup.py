@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+
+def test_startup_profile_report():
+    """Проверка отчёта о запуске.
+
+    С DJANGO_STARTUP_PROFILE запуск сообщает время импортов до готовности
+    реестра приложений, а облегчённый профиль не загружает админку.
+    """
+    result = subprocess.run(
+        (
+            sys.executable, '-c',
+            'import sys, yanews.wsgi; '
+            'print("django.contrib.admin" in sys.modules)',
+        ),
+        cwd=settings.BASE_DIR,
+        env={
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': 'yanews.settings_lean',
+            'DJANGO_STARTUP_PROFILE': '1',
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert (
+        'import time: self [us] | cumulative | imported package'
+        in result.stderr
+        and 'wsgi: реестр приложений готов' in result.stderr
+    ), 'Отчёт о запуске не выводится.'
+    assert result.stdout.split() == ['False'], (
+        'Облегчённый профиль загружает админку.'
+    )
@@ -0,0 +1,46 @@
+import json
+
+from django.core.management import call_command
+
+from yanews.static import StaticFilesApplication
+
+
+def test_collected_static_is_hashed_and_compressed(settings, tmp_path):
+    """Проверка собранной статики.
+
+    Файлы получают хешированные имена и сжатые копии, а обёртка
+    отдаёт их со сжатием и бессрочным кешированием, не вызывая Django.
+    """
+    settings.STATIC_ROOT = tmp_path
+    call_command('collectstatic', interactive=False, verbosity=0)
+    manifest = json.loads((tmp_path / 'staticfiles.json').read_text())
+    hashed_name = manifest['paths']['admin/css/base.css']
+    assert (tmp_path / f'{hashed_name}.gz').exists(), (
+        'При сборке статики не создаются сжатые копии.'
+    )
+
+    def django_application(environ, start_response):
+        raise AssertionError('Статика передана в Django.')
+
+    application = StaticFilesApplication(django_application)
+    response_headers = {}
+
+    def start_response(status, headers):
+        response_headers.update(headers, status=status)
+
+    response = application(
+        {
+            'PATH_INFO': settings.STATIC_URL + hashed_name,
+            'REQUEST_METHOD': 'GET',
+            'HTTP_ACCEPT_ENCODING': 'gzip, deflate',
+        },
+        start_response
+    )
+    body = b''.join(response)
+    response.close()
+    assert (
+        response_headers['status'] == '200 OK'
+        and response_headers['Content-Encoding'] == 'gzip'
+        and 'immutable' in response_headers['Cache-Control']
+        and len(body) == int(response_headers['Content-Length'])
+    ), 'Хешированный файл отдаётся без сжатия или бессрочного кеша.'
@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .backends import forget_user
+from .conditional import touch_news
+from .latest import (
+    push_latest_comment, schedule_latest_comments_rebuild,
+    update_latest_comment
+)
+from .models import Comment, News
+from .snapshot import schedule_home_snapshot_rebuild
+
+# Отправляется после пакетной записи или удаления комментариев в обход
+# save() и delete(), аргумент news_ids — множество затронутых новостей.
+comments_flushed = Signal()
+# Отправляется после пакетной записи новостей в обход save().
+news_flushed = Signal()
+
+
+@receiver((post_save, post_delete), sender=get_user_model())
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Сбрасывает закешированного пользователя при его изменении."""
+    forget_user(instance.pk)
+
+
+@receiver((post_save, post_delete, news_flushed), sender=News)
+def refresh_snapshot_on_news(sender, **kwargs):
+    """Пересобирает снимок главной при изменении новости."""
+    schedule_home_snapshot_rebuild()
+
+
+@receiver(post_save, sender=Comment)
+def refresh_snapshot_on_comment(sender, created, **kwargs):
+    """Пересобирает снимок главной при появлении комментария."""
+    if created:
+        schedule_home_snapshot_rebuild()
+
+
+@receiver((post_delete, comments_flushed), sender=Comment)
+def refresh_snapshot_on_comments(sender, **kwargs):
+    """Пересобирает снимок главной при удалении или пакетной записи."""
+    schedule_home_snapshot_rebuild()
+
+
+@receiver((post_save, post_delete), sender=News)
+def touch_news_on_save(sender, instance, **kwargs):
+    """Сбрасывает ETag страницы новости при её изменении."""
+    touch_news(instance.pk)
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def touch_news_on_comment(sender, instance, **kwargs):
+    """Сбрасывает ETag страницы новости при изменении комментария."""
+    touch_news(instance.news_id)
+
+
+@receiver(comments_flushed, sender=Comment)
+def touch_news_on_flush(sender, news_ids, **kwargs):
+    """Сбрасывает ETag страниц новостей после пакетной записи."""
+    for news_id in news_ids:
+        touch_news(news_id)
+
+
+@receiver(post_save, sender=Comment)
+def update_latest_on_save(sender, instance, created, **kwargs):
+    """Добавляет новый комментарий в буфер последних или обновляет его."""
+    if created:
+        push_latest_comment(instance)
+    else:
+        update_latest_comment(instance)
+
+
+@receiver((post_delete, comments_flushed), sender=Comment)
+def rebuild_latest_on_comments(sender, **kwargs):
+    """Пересобирает буфер последних при удалении или пакетной записи."""
+    schedule_latest_comments_rebuild()
+
+
+@receiver((post_save, post_delete, news_flushed), sender=News)
+def rebuild_latest_on_news(sender, **kwargs):
+    """Пересобирает буфер последних: в нём хранятся заголовки новостей."""
+    schedule_latest_comments_rebuild()
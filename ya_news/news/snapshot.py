@@ -0,0 +1,73 @@
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.text import Truncator
+
+from .models import News, with_comment_count
+
+SNAPSHOT_KEY = 'news:home_snapshot'
+TRUNCATE_WORDS = 15
+
+HomeNews = namedtuple(
+    'HomeNews', ('pk', 'title', 'text', 'date', 'comment_count')
+)
+
+
+def build_home_snapshot():
+    """Собирает снимок главной страницы одним запросом.
+
+    Вложенный запрос выбирает NEWS_COUNT_ON_HOME_PAGE последних новостей,
+    и комментарии считаются только для них. Текст обрезается так же,
+    как фильтром truncatewords.
+    """
+    latest = News.objects.values('pk')[:settings.NEWS_COUNT_ON_HOME_PAGE]
+    rows = with_comment_count(
+        News.objects.filter(pk__in=latest)
+    ).values_list('pk', 'title', 'text', 'date', 'comment_count')
+    return [
+        HomeNews(
+            pk, title,
+            Truncator(text).words(TRUNCATE_WORDS, truncate=' …'),
+            date, comment_count
+        )
+        for pk, title, text, date, comment_count in rows
+    ]
+
+
+def rebuild_home_snapshot():
+    """Пересобирает снимок и кладёт его в кеш.
+
+    Кеш у каждого процесса свой, поэтому снимок живёт не дольше
+    NEWS_HOME_SNAPSHOT_TIMEOUT: процессы, не видевшие изменения,
+    пересоберут его по истечении срока.
+    """
+    snapshot = build_home_snapshot()
+    cache.set(SNAPSHOT_KEY, snapshot, settings.NEWS_HOME_SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def get_home_snapshot():
+    """Снимок главной страницы из кеша; собирается только при промахе."""
+    snapshot = cache.get(SNAPSHOT_KEY)
+    if snapshot is None:
+        snapshot = rebuild_home_snapshot()
+    return snapshot
+
+
+def schedule_home_snapshot_rebuild():
+    """Сбрасывает снимок и пересобирает его после фиксации транзакции.
+
+    Сброс сразу нужен, чтобы эта же транзакция не увидела старый снимок,
+    а пересборка после фиксации — чтобы параллельный запрос не оставил
+    в кеше снимок без незафиксированных изменений. Внутри одной
+    транзакции пересборка планируется только один раз.
+    """
+    cache.delete(SNAPSHOT_KEY)
+    connection = transaction.get_connection()
+    if not any(
+        func is rebuild_home_snapshot
+        for _, func in connection.run_on_commit
+    ):
+        transaction.on_commit(rebuild_home_snapshot)
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from news import views
+from news import api, views
 
 app_name = 'news'
 
@@ -13,4 +13,25 @@ urlpatterns = [
         name='delete'
     ),
     path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
+    path(
+        'export/comments/',
+        views.CommentExport.as_view(),
+        name='export'
+    ),
+    path('api/news/', api.NewsListApi.as_view(), name='api_news_list'),
+    path(
+        'api/news/<int:pk>/',
+        api.NewsDetailApi.as_view(),
+        name='api_news_detail'
+    ),
+    path(
+        'api/news/<int:pk>/comments/',
+        api.NewsCommentsApi.as_view(),
+        name='api_news_comments'
+    ),
+    path(
+        'api/comments/<int:pk>/',
+        api.CommentApi.as_view(),
+        name='api_comment'
+    ),
 ]
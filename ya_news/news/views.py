@@ -1,11 +1,27 @@
+from datetime import date
+from http import HTTPStatus
+
 from django.conf import settings
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.db.models import Count, Max, Q, Sum
+from django.http import (
+    HttpResponseBadRequest, HttpResponseRedirect, StreamingHttpResponse
+)
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django.views import generic
 
-from .forms import CommentForm
-from .models import Comment, News
+from .conditional import news_validators, touch_news
+from .export import FORMATS, export_chunks
+from .forms import CONFLICT_WARNING, CommentForm
+from .idempotency import IdempotentPostMixin
+from .latest import get_latest_comments
+from .models import Comment, EditConflict, News
+from .ratelimit import RateLimitMixin
+from .snapshot import get_home_snapshot
+from .write_behind import get_writer
 
 
 class NewsList(generic.ListView):
@@ -17,23 +33,82 @@ class NewsList(generic.ListView):
         """
         Выводим только несколько последних новостей.
 
-        Их количество определяется в настройках проекта.
+        Их количество определяется в настройках проекта. Список берётся
+        из снимка главной страницы, который пересобирается при записи.
+        """
+        return get_home_snapshot()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['latest_comments'] = get_latest_comments()
+        return context
+
+
+def with_author_name(comments):
+    # news нужен связанному менеджеру, чтобы проставить новость
+    # комментариям без лишних запросов.
+    return comments.select_related('author').only(
+        'news', 'author', 'text', 'created', 'author__username'
+    )
+
+
+class NewsCommentsMixin:
+    """Добавляет в контекст комментарии новости."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = self.get_comments()
+        return context
+
+    def get_comments(self):
+        """Комментарии новости вместе с архивными, если они есть.
+
+        Из таблицы пользователей читается только имя автора.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        comments = list(with_author_name(self.object.comment_set.all()))
+        if self.object.has_archive:
+            archived = with_author_name(
+                self.object.archivedcomment_set.all()
+            )
+            comments = sorted(
+                [*archived, *comments], key=lambda comment: comment.created
+            )
+        return comments
 
 
-class NewsDetail(generic.DetailView):
+class NewsDetail(NewsCommentsMixin, generic.DetailView):
     model = News
     template_name = 'news/detail.html'
 
-    def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
+    def get(self, request, *args, **kwargs):
+        """Отвечает 304 без рендеринга, если страница не менялась."""
+        live = Q(comment__is_deleted=False)
+        state = get_object_or_404(
+            self.model.objects.filter(pk=self.kwargs['pk']).annotate(
+                last_comment=Max('comment__created'),
+                live_comments=Count('comment', filter=live),
+                versions=Sum('comment__version', filter=live)
+            ).values_list('date', 'last_comment', 'live_comments', 'versions')
+        )
+        etag, last_modified = news_validators(
+            request, self.kwargs['pk'], *state
         )
-        return obj
+        # Страницу с формой проверяем только по ETag: If-Modified-Since
+        # не знает о смене CSRF-cookie.
+        response = get_conditional_response(
+            request, etag=etag, last_modified=(
+                None if request.user.is_authenticated else last_modified
+            )
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True, max_age=0)
+        else:
+            patch_cache_control(response, max_age=0)
+        return response
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -44,6 +119,9 @@ class NewsDetail(generic.DetailView):
 
 class NewsComment(
         LoginRequiredMixin,
+        IdempotentPostMixin,
+        RateLimitMixin,
+        NewsCommentsMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -56,6 +134,16 @@ class NewsComment(
         return super().post(request, *args, **kwargs)
 
     def form_valid(self, form):
+        if settings.NEWS_COMMENT_WRITE_BEHIND:
+            get_writer().put(
+                news_id=self.object.pk,
+                author_id=self.request.user.pk,
+                text=form.cleaned_data['text']
+            )
+            # Страница должна отрисоваться заново с новым ключом формы,
+            # а не вернуть 304 со старым до записи комментария.
+            touch_news(self.object.pk)
+            return HttpResponseRedirect(self.get_success_url())
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
@@ -63,8 +151,9 @@ class NewsComment(
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
@@ -93,12 +182,79 @@ class CommentBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
-class CommentUpdate(CommentBase, generic.UpdateView):
+class EditConflictMixin:
+    """Возвращает форму с ошибкой и кодом 409 при конфликте правок.
+
+    В скрытое поле формы подставляется текущая версия, поэтому повторная
+    отправка осознанно перезапишет чужие изменения.
+    """
+    conflict_message = CONFLICT_WARNING
+
+    def form_valid(self, form):
+        try:
+            return super().form_valid(form)
+        except EditConflict:
+            form.add_error(None, self.conflict_message)
+            form.data = form.data.copy()
+            form.data['version'] = self.get_queryset().values_list(
+                'version', flat=True
+            ).get(pk=self.object.pk)
+            return self.render_to_response(
+                self.get_context_data(form=form),
+                status=HTTPStatus.CONFLICT
+            )
+
+
+class CommentUpdate(
+        CommentBase, IdempotentPostMixin, EditConflictMixin, generic.UpdateView
+):
     """Редактирование комментария."""
     template_name = 'news/edit.html'
     form_class = CommentForm
 
 
-class CommentDelete(CommentBase, generic.DeleteView):
+class SoftDeleteMixin:
+    """Помечает объект удалённым вместо DELETE в запросе."""
+
+    def delete(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        success_url = self.get_success_url()
+        self.object.soft_delete()
+        return HttpResponseRedirect(success_url)
+
+
+class CommentDelete(CommentBase, SoftDeleteMixin, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+
+class CommentExport(UserPassesTestMixin, generic.View):
+    """Потоковая выгрузка комментариев для аналитиков.
+
+    Параметры: format (csv или jsonl), since и until в формате ГГГГ-ММ-ДД.
+    """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in FORMATS:
+            return HttpResponseBadRequest('Неизвестный формат выгрузки.')
+        try:
+            filters = {
+                name: date.fromisoformat(request.GET[name])
+                for name in ('since', 'until') if request.GET.get(name)
+            }
+        except ValueError:
+            return HttpResponseBadRequest(
+                'Дата должна быть в формате ГГГГ-ММ-ДД.'
+            )
+        response = StreamingHttpResponse(
+            export_chunks(export_format, **filters),
+            content_type=FORMATS[export_format][1]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="comments.{export_format}"'
+        )
+        return response
@@ -0,0 +1,270 @@
+import atexit
+import json
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Comment, News
+from .signals import comments_flushed
+
+logger = logging.getLogger(__name__)
+
+# Случайный token отличает писателя от упавшего процесса с тем же pid.
+ACTIVE_SPILL = 'comments-{pid}-{token}.jsonl'
+ROTATED_SPILL = 'comments-{pid}-{token}-{stamp}.flushing'
+# Комментарии к удалённым новостям или от удалённых авторов; recover()
+# их не подбирает.
+REJECTED_SPILL = 'comments-{pid}-{token}-{stamp}.rejected'
+SPILL_NAME = re.compile(
+    r'^comments-(?P<pid>\d+)-(?P<token>[0-9a-f]+)'
+    r'(?:\.jsonl|-\d+\.flushing)$'
+)
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class CommentWriter:
+    """Отложенная пакетная запись комментариев.
+
+    Комментарий сначала дописывается в spill-файл процесса и только
+    потом попадает в очередь, поэтому после падения процесса его можно
+    восстановить через recover(). Фоновый поток сохраняет очередь
+    одним bulk_create раз в flush_interval секунд или как только
+    в ней набирается batch_size комментариев. Доставка «хотя бы один
+    раз»: падение между записью в БД и удалением spill-файла приведёт
+    к повторной вставке пакета при восстановлении.
+    """
+
+    def __init__(self, spill_dir, batch_size, flush_interval):
+        self.spill_dir = Path(spill_dir)
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._failed = False
+        self._thread = None
+        self.token = secrets.token_hex(8)
+
+    @property
+    def active_spill(self):
+        return self.spill_dir / ACTIVE_SPILL.format(
+            pid=os.getpid(), token=self.token
+        )
+
+    def put(self, news_id, author_id, text):
+        """Ставит комментарий в очередь на запись."""
+        record = {
+            'news_id': news_id,
+            'author_id': author_id,
+            'text': text,
+            'created': timezone.now().isoformat(),
+        }
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._condition:
+            with open(self.active_spill, 'a', encoding='utf-8') as spill:
+                spill.write(line)
+                spill.flush()
+                os.fsync(spill.fileno())
+            self._pending.append(record)
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+
+    def flush(self):
+        """Записывает накопленную очередь в БД.
+
+        Возвращает количество сохранённых комментариев.
+        """
+        with self._condition:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, []
+            rotated = self._spill_path(ROTATED_SPILL)
+            os.replace(self.active_spill, rotated)
+        try:
+            saved = self._save(batch)
+        except Exception:
+            logger.exception(
+                'Не удалось сохранить %s комментариев, они остаются в %s',
+                len(batch), rotated
+            )
+            self._failed = True
+            return 0
+        rotated.unlink()
+        return saved
+
+    def recover(self):
+        """Сохраняет комментарии из spill-файлов, оставшихся после сбоев.
+
+        Подбираются файлы завершившихся процессов, файлы с pid текущего
+        процесса (свои после неудачной записи и чужие, оставшиеся от
+        упавшего процесса с тем же pid), кроме активного файла самого
+        писателя. Посторонние файлы пропускаются. Перед чтением файл
+        переименовывается в файл этого писателя, поэтому несколько
+        процессов не восстановят один и тот же файл дважды.
+        """
+        recovered = 0
+        for path in sorted(self.spill_dir.iterdir()):
+            match = SPILL_NAME.match(path.name)
+            if match is None or path == self.active_spill:
+                continue
+            pid = int(match['pid'])
+            if pid != os.getpid() and _pid_alive(pid):
+                continue
+            claimed = self._spill_path(ROTATED_SPILL)
+            try:
+                os.replace(path, claimed)
+            except FileNotFoundError:
+                # Файл уже забрал другой процесс.
+                continue
+            with open(claimed, encoding='utf-8') as spill:
+                batch = [json.loads(line) for line in spill if line.strip()]
+            recovered += self._save(batch)
+            claimed.unlink()
+        return recovered
+
+    def start(self):
+        """Запускает фоновый поток записи."""
+        self._thread = threading.Thread(
+            target=self._run, name='comment-writer', daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Останавливает поток и сохраняет остаток очереди."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _run(self):
+        self._safe_recover()
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: (
+                        self._stopping
+                        or len(self._pending) >= self.batch_size
+                    ),
+                    timeout=self.flush_interval
+                )
+                if self._stopping:
+                    break
+            self.flush()
+            if self._failed:
+                self._failed = False
+                self._safe_recover()
+        connection.close()
+
+    def _safe_recover(self):
+        try:
+            self.recover()
+        except Exception:
+            logger.exception('Не удалось восстановить комментарии')
+            self._failed = True
+
+    def _spill_path(self, template):
+        return self.spill_dir / template.format(
+            pid=os.getpid(), token=self.token, stamp=time.time_ns()
+        )
+
+    def _save(self, batch):
+        """Сохраняет пакет и возвращает количество записанных комментариев.
+
+        Если новость или автор комментария успели удалить, пакет целиком
+        не проходит проверку внешних ключей. Тогда такие комментарии
+        откладываются в .rejected-файл, а остальные сохраняются.
+        """
+        try:
+            self._insert(batch)
+        except IntegrityError:
+            batch = self._reject_orphans(batch)
+            self._insert(batch)
+        return len(batch)
+
+    def _reject_orphans(self, batch):
+        news_ids = set(News.objects.filter(
+            pk__in={record['news_id'] for record in batch}
+        ).values_list('pk', flat=True))
+        author_ids = set(get_user_model().objects.filter(
+            pk__in={record['author_id'] for record in batch}
+        ).values_list('pk', flat=True))
+        valid, rejected = [], []
+        for record in batch:
+            if (
+                record['news_id'] in news_ids
+                and record['author_id'] in author_ids
+            ):
+                valid.append(record)
+            else:
+                rejected.append(record)
+        if rejected:
+            path = self._spill_path(REJECTED_SPILL)
+            with open(path, 'w', encoding='utf-8') as spill:
+                for record in rejected:
+                    spill.write(
+                        json.dumps(record, ensure_ascii=False) + '\n'
+                    )
+            logger.warning(
+                'Комментарии к удалённым новостям или от удалённых авторов '
+                '(%s) отложены в %s', len(rejected), path
+            )
+        return valid
+
+    def _insert(self, batch):
+        if not batch:
+            return
+        Comment.objects.bulk_create(
+            (
+                Comment(**{
+                    **record, 'created': parse_datetime(record['created'])
+                })
+                for record in batch
+            ),
+            batch_size=self.batch_size
+        )
+        comments_flushed.send(
+            sender=Comment,
+            news_ids={record['news_id'] for record in batch}
+        )
+
+
+def get_writer():
+    """Писатель комментариев процесса; поток стартует при первом вызове."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                writer = CommentWriter(
+                    settings.NEWS_COMMENT_SPILL_DIR,
+                    settings.NEWS_COMMENT_FLUSH_BATCH,
+                    settings.NEWS_COMMENT_FLUSH_INTERVAL_MS / 1000
+                )
+                writer.start()
+                _writer = writer
+    return _writer
@@ -0,0 +1,266 @@
+"""Метрики запросов в текстовом формате Prometheus.
+
+MetricsMiddleware считает по имени маршрута (news:home, news:detail…)
+время ответа, количество и время запросов к БД, время отрисовки
+шаблонов и попадания в кеш. Каждый поток пишет в свои словари без
+блокировок, а metrics_view складывает их при сборе. Блокировка
+берётся только при появлении нового потока и при сборе. Счётчики
+у каждого процесса свои, как и кеш LocMemCache.
+"""
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+UNRESOLVED = '<unresolved>'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_local = threading.local()
+_stores = []
+_stores_lock = threading.Lock()
+_MISSING = object()
+
+
+class Store:
+    """Счётчики одного потока: имя маршрута → список значений."""
+
+    def __init__(self):
+        self.thread = threading.current_thread()
+        # Корзины гистограммы, затем сумма и количество.
+        self.requests = {}
+        # Запросы к БД и их суммарное время.
+        self.queries = {}
+        # Суммарное время и количество отрисовок шаблонов.
+        self.templates = {}
+        # Попадания и промахи кеша.
+        self.cache = {}
+
+    def merge(self, other):
+        for name in ('requests', 'queries', 'templates', 'cache'):
+            target = getattr(self, name)
+            for view, values in list(getattr(other, name).items()):
+                current = target.setdefault(view, [0] * len(values))
+                for index, value in enumerate(values):
+                    current[index] += value
+
+
+# Счётчики завершившихся потоков, чтобы не держать их хранилища.
+_retired = Store()
+
+
+def _retire_dead():
+    """Переносит счётчики завершившихся потоков в _retired.
+
+    Вызывается под _stores_lock.
+    """
+    alive = []
+    for store in _stores:
+        if store.thread.is_alive():
+            alive.append(store)
+        else:
+            _retired.merge(store)
+    _stores[:] = alive
+    return alive
+
+
+def _store():
+    store = getattr(_local, 'store', None)
+    if store is None:
+        store = _local.store = Store()
+        with _stores_lock:
+            # Сервер может запускать поток на каждый запрос.
+            _retire_dead()
+            _stores.append(store)
+    return store
+
+
+def _add(counters, view, values):
+    current = counters.get(view)
+    if current is None:
+        current = counters[view] = [0] * len(values)
+    for index, value in enumerate(values):
+        current[index] += value
+
+
+def _bucket(duration):
+    for index, bound in enumerate(BUCKETS):
+        if duration <= bound:
+            return index
+    return len(BUCKETS)
+
+
+class RequestCounters:
+    """Счётчики текущего запроса до того, как станет известен маршрут."""
+    __slots__ = ('queries', 'query_time', 'hits', 'misses', 'templates')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.templates = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_time += time.perf_counter() - start
+
+
+def _current():
+    return getattr(_local, 'current', None)
+
+
+def record_cache(hits, misses):
+    """Учитывает обращение к кешу в текущем запросе."""
+    counters = _current()
+    if counters is not None:
+        counters.hits += hits
+        counters.misses += misses
+
+
+class MetricsMiddleware:
+    """Собирает метрики запроса; должен стоять первым в MIDDLEWARE."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counters = _local.current = RequestCounters()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counters))
+                return self.get_response(request)
+        finally:
+            duration = time.perf_counter() - start
+            _local.current = None
+            self.record(request, counters, duration)
+
+    def process_template_response(self, request, response):
+        counters = _current()
+        if counters is not None:
+            start = time.perf_counter()
+            response.add_post_render_callback(
+                lambda response: counters.templates.append(
+                    time.perf_counter() - start
+                )
+            )
+        return response
+
+    def record(self, request, counters, duration):
+        match = request.resolver_match
+        view = match.view_name if match is not None else UNRESOLVED
+        store = _store()
+        buckets = [0] * (len(BUCKETS) + 1)
+        buckets[_bucket(duration)] = 1
+        _add(store.requests, view, (*buckets, duration, 1))
+        _add(store.queries, view, (counters.queries, counters.query_time))
+        if counters.templates:
+            _add(store.templates, view, (
+                sum(counters.templates), len(counters.templates)
+            ))
+        if counters.hits or counters.misses:
+            _add(store.cache, view, (counters.hits, counters.misses))
+
+
+class InstrumentedLocMemCache(LocMemCache):
+    """LocMemCache, который считает попадания для MetricsMiddleware.
+
+    get_many() и get_or_set() базового класса читают через get(),
+    поэтому учитываются тоже.
+    """
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        record_cache(*((0, 1) if value is _MISSING else (1, 0)))
+        return default if value is _MISSING else value
+
+
+def collect():
+    """Сумма счётчиков всех потоков процесса."""
+    total = Store()
+    with _stores_lock:
+        alive = _retire_dead()
+        total.merge(_retired)
+    for store in alive:
+        total.merge(store)
+    return total
+
+
+def _labels(**labels):
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', r'\\').replace('"', r'\"')
+        )
+        for name, value in labels.items()
+    )
+    return '{' + pairs + '}'
+
+
+def _family(lines, name, kind, help_text):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+
+
+def render(store):
+    """Счётчики в текстовом формате Prometheus."""
+    lines = []
+    name = 'django_request_duration_seconds'
+    _family(lines, name, 'histogram', 'Время ответа по маршрутам.')
+    for view, values in sorted(store.requests.items()):
+        cumulative = 0
+        for bound, count in zip((*BUCKETS, '+Inf'), values):
+            cumulative += count
+            lines.append(
+                f'{name}_bucket{_labels(view=view, le=bound)} {cumulative}'
+            )
+        lines.append(f'{name}_sum{_labels(view=view)} {values[-2]}')
+        lines.append(f'{name}_count{_labels(view=view)} {values[-1]}')
+    families = (
+        (
+            'django_db_queries_total', 'Запросы к БД.',
+            store.queries, 0
+        ),
+        (
+            'django_db_query_duration_seconds_total',
+            'Суммарное время запросов к БД.',
+            store.queries, 1
+        ),
+    )
+    for name, help_text, counters, index in families:
+        _family(lines, name, 'counter', help_text)
+        for view, values in sorted(counters.items()):
+            lines.append(f'{name}{_labels(view=view)} {values[index]}')
+    name = 'django_template_render_seconds'
+    _family(lines, name, 'summary', 'Время отрисовки шаблонов.')
+    for view, (total, count) in sorted(store.templates.items()):
+        lines.append(f'{name}_sum{_labels(view=view)} {total}')
+        lines.append(f'{name}_count{_labels(view=view)} {count}')
+    name = 'django_cache_requests_total'
+    _family(
+        lines, name, 'counter',
+        'Чтения из кеша; доля попаданий — result="hit" к сумме.'
+    )
+    for view, values in sorted(store.cache.items()):
+        for result, count in zip(('hit', 'miss'), values):
+            lines.append(
+                f'{name}{_labels(view=view, result=result)} {count}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Отдаёт метрики адресам из METRICS_ALLOWED_IPS."""
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    return HttpResponse(render(collect()), content_type=CONTENT_TYPE)
@@ -21,6 +21,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yanews.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -58,6 +59,23 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'yanews.metrics.InstrumentedLocMemCache',
+    }
+}
+
+
+# Сессии читаются из кеша и только при промахе из БД. Для узлов без
+# общего кеша подходит 'django.contrib.sessions.backends.signed_cookies'.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+AUTHENTICATION_BACKENDS = [
+    'news.backends.CachedModelBackend',
+]
+
+AUTH_USER_CACHE_TIMEOUT = 60
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -74,9 +92,50 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Хешированные имена и сжатые копии строятся при collectstatic.
+STATICFILES_STORAGE = 'yanews.storage.CompressedManifestStaticFilesStorage'
+
+# Время кеширования статики без хеша в имени, в секундах.
+STATIC_MAX_AGE = 60
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+# Время жизни снимка главной в кеше процесса, см. news/snapshot.py.
+NEWS_HOME_SNAPSHOT_TIMEOUT = 60
+# Последние комментарии сайта на главной, см. news/latest.py.
+NEWS_LATEST_COMMENTS = 5
+NEWS_LATEST_COMMENTS_TIMEOUT = 60 * 5
+
+# Размер страницы JSON API по умолчанию и наибольший допустимый.
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+# Комментарии новостей старше этого срока переносит в архив
+# команда archive_comments.
+NEWS_ARCHIVE_AFTER_DAYS = 365
+
+# Отложенная пакетная запись комментариев, см. news/write_behind.py.
+NEWS_COMMENT_WRITE_BEHIND = False
+NEWS_COMMENT_FLUSH_INTERVAL_MS = 200
+NEWS_COMMENT_FLUSH_BATCH = 100
+NEWS_COMMENT_SPILL_DIR = BASE_DIR / 'spill'
+
+# Ограничение частоты POST-запросов, см. news/ratelimit.py.
+# RATELIMIT_BACKEND: 'local' — память процесса, 'cache' — общий кеш.
+RATELIMIT_ENABLED = True
+RATELIMIT_BACKEND = 'local'
+RATELIMIT_RATE = 0.5
+RATELIMIT_BURST = 10
+
+# Повторная отправка формы, см. news/idempotency.py.
+IDEMPOTENCY_TIMEOUT = 60 * 10
+IDEMPOTENCY_WAIT_MS = 2000
+
+# Метрики Prometheus по адресу /metrics/, см. yanews/metrics.py.
+METRICS_ALLOWED_IPS = ['127.0.0.1']
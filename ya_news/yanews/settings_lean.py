@@ -0,0 +1,37 @@
+"""Профиль для рабочих узлов без админки.
+
+Запуск: DJANGO_SETTINGS_MODULE=yanews.settings_lean. Админка и сообщения
+не устанавливаются, поэтому процесс поднимается быстрее и занимает
+меньше памяти; адреса admin/ в этом профиле нет.
+"""
+from .settings import *  # noqa: F401, F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, TEMPLATES
+
+LEAN_EXCLUDED = (
+    'django.contrib.admin',
+    'django.contrib.messages',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.contrib.messages.context_processors.messages',
+)
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in LEAN_EXCLUDED]
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware not in LEAN_EXCLUDED
+]
+
+TEMPLATES = [
+    {
+        **backend,
+        'OPTIONS': {
+            **backend['OPTIONS'],
+            'context_processors': [
+                processor
+                for processor in backend['OPTIONS']['context_processors']
+                if processor not in LEAN_EXCLUDED
+            ],
+        },
+    }
+    for backend in TEMPLATES
+]
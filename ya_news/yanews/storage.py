@@ -0,0 +1,50 @@
+"""Хранилище статики с хешированными именами и сжатыми копиями."""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.json', '.map', '.svg', '.txt', '.xml', '.html'
+)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest-хранилище, которое кладёт рядом с файлами .gz и .br.
+
+    Сжатые копии строятся один раз при collectstatic, поэтому
+    WSGI-обёртке остаётся только выбрать подходящую. Brotli
+    используется, если установлен пакет brotli. Без манифеста, например
+    в тестах или до первого collectstatic, отдаются исходные имена.
+    """
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in {*self.hashed_files, *self.hashed_files.values()}:
+            if name.endswith(COMPRESSIBLE_EXTENSIONS) and self.exists(name):
+                self.compress(self.path(name))
+
+    def compress(self, path):
+        """Пишет сжатые копии файла, если они меньше исходного."""
+        with open(path, 'rb') as source:
+            content = source.read()
+        variants = [('.gz', gzip.compress(content, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(content)))
+        for suffix, compressed in variants:
+            if len(compressed) >= len(content):
+                continue
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
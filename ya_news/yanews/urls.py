@@ -1,14 +1,21 @@
-from django.contrib import admin
+from django.apps import apps
 from django.contrib.auth import views as auth_views
 from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path
 from django.views.generic import CreateView
 
+from .metrics import metrics_view
+
 urlpatterns = [
     path('', include('news.urls')),
-    path('admin/', admin.site.urls),
+    path('metrics/', metrics_view, name='metrics'),
 ]
 
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
+
 auth_urls = ([
     path(
         'login/',
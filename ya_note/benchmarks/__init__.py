@@ -0,0 +1,47 @@
+"""Бенчмарки проекта YaNote.
+
+Запускаются из каталога проекта: ``python -m benchmarks.<модуль>``.
+Каждый бенчмарк работает на временной тестовой БД.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+
+
+@contextmanager
+def test_database(name=None):
+    """Поднимает Django и временную тестовую БД.
+
+    По умолчанию SQLite создаёт БД в памяти; name задаёт файл БД,
+    когда важна стоимость записи на диск.
+    """
+    django.setup()
+    from django.db import connection
+    if name is not None:
+        connection.settings_dict['TEST']['NAME'] = name
+    from django.test.utils import (
+        setup_test_environment, teardown_test_environment
+    )
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+@contextmanager
+def timer(label, count=None):
+    """Печатает время выполнения блока и, если задано, скорость."""
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    line = f'{label}: {elapsed:.3f} с'
+    if count:
+        line += f', {count / elapsed:,.0f} оп/с'
+    print(line)
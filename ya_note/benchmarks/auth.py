@@ -0,0 +1,47 @@
+"""Число запросов к БД на один авторизованный запрос к NotesList.
+
+Сравнивает сессии в БД с обычным ModelBackend и кешированные режимы.
+"""
+from . import test_database
+
+URL_NAME = 'notes:list'
+MODES = (
+    (
+        'db + ModelBackend',
+        {
+            'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+            'AUTHENTICATION_BACKENDS': [
+                'django.contrib.auth.backends.ModelBackend'
+            ],
+        },
+    ),
+    ('cached_db + CachedModelBackend', {}),
+    (
+        'signed_cookies + CachedModelBackend',
+        {'SESSION_ENGINE': 'django.contrib.sessions.backends.signed_cookies'},
+    ),
+)
+
+
+def main():
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+
+    user = get_user_model().objects.create(username='Читатель')
+    url = reverse(URL_NAME)
+    for label, overrides in MODES:
+        with override_settings(**overrides):
+            client = Client()
+            client.force_login(user)
+            client.get(url)
+            with CaptureQueriesContext(connection) as context:
+                client.get(url)
+        print(f'{URL_NAME} [{label}]: запросов к БД — {len(context)}')
+
+
+if __name__ == '__main__':
+    with test_database():
+        main()
@@ -0,0 +1,46 @@
+"""Скорость выдачи изменений заметок по токену синхронизации.
+
+У автора много заметок, изменилась малая часть. Запрос изменений
+должен идти по индексу (author, revision) и не зависеть от общего
+числа заметок.
+"""
+import argparse
+
+from . import test_database, timer
+
+
+def main(count, changed, repeat):
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+
+    from notes.factories import make_notes, make_users
+
+    author, other = make_users(2)
+    with timer('Создание заметок', count):
+        make_notes([author, other], count, fetch=False)
+    token = make_notes(author, changed, slug_prefix='changed')[0].revision - 1
+
+    client = Client()
+    client.force_login(author)
+    url = reverse('notes:api_changes')
+    with timer(f'Запрос изменений ({changed} из {count})', repeat):
+        for _ in range(repeat):
+            client.get(url, {'since': token})
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'EXPLAIN QUERY PLAN SELECT id FROM notes_note '
+            'WHERE author_id = %s AND revision > %s ORDER BY revision',
+            (author.pk, token)
+        )
+        print('План запроса:', *(row[-1] for row in cursor.fetchall()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=200_000)
+    parser.add_argument('--changed', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    with test_database():
+        main(args.count, args.changed, args.repeat)
@@ -3,10 +3,13 @@
 import os
 import sys
 
+from yanote import startup
+
 
 def main():
     """Run administrative tasks."""
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    startup.begin()
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -15,6 +18,7 @@ def main():
             "available on your PYTHONPATH environment variable? Did you "
             "forget to activate a virtual environment?"
         ) from exc
+    startup.setup_and_report('manage.py')
     execute_from_command_line(sys.argv)
 
 
@@ -1,5 +1,64 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+from django.template.response import TemplateResponse
 
 from .models import Note
+from .purge import delete_users
 
-admin.site.register(Note)
+
+@admin.register(Note)
+class NoteAdmin(admin.ModelAdmin):
+
+    def delete_queryset(self, request, queryset):
+        """Помечает выбранные заметки удалёнными по одной.
+
+        QuerySet.delete() обходит Note.delete() и не оставляет надгробий,
+        поэтому клиенты синхронизации не узнали бы об удалении.
+        """
+        for note in queryset:
+            note.soft_delete()
+
+
+User = get_user_model()
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class BatchDeleteUserAdmin(UserAdmin):
+    actions = ('delete_with_notes',)
+
+    @admin.action(
+        description='Удалить выбранных пользователей с заметками',
+        permissions=('delete',)
+    )
+    def delete_with_notes(self, request, queryset):
+        """Удаляет пользователей, а их заметки — порциями.
+
+        Страница подтверждения показывает только количество заметок,
+        не загружая их, в отличие от delete_selected.
+        """
+        if request.POST.get('post'):
+            count = queryset.count()
+            deleted = delete_users(queryset)
+            self.message_user(
+                request,
+                f'Удалено пользователей: {count}, заметок: {deleted}.',
+                messages.SUCCESS
+            )
+            return None
+        return TemplateResponse(
+            request,
+            'admin/auth/user/delete_with_notes.html',
+            {
+                **self.admin_site.each_context(request),
+                'title': 'Удаление пользователей с заметками',
+                'opts': self.model._meta,
+                'users': queryset,
+                'note_count': Note._base_manager.filter(
+                    author__in=queryset
+                ).count(),
+                'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+            }
+        )
@@ -0,0 +1,303 @@
+"""JSON API заметок.
+
+Доступны только заметки текущего пользователя. Заметки сериализуются
+прямо из values_list() без создания моделей, ?fields= выбирает поля,
+список выдаётся постранично по id: ?limit= и ?after= из поля next.
+"""
+import json
+from http import HTTPStatus
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import generic
+from django.views.decorators.gzip import gzip_page
+
+from . import cache as notes_cache
+from .forms import NoteForm
+from .models import EditConflict, NoteTombstone
+from .ratelimit import RateLimitMixin
+from .views import NoteBase
+
+NOTE_FIELDS = (
+    'id', 'title', 'text', 'slug', 'updated', 'revision', 'version'
+)
+TOMBSTONE_FIELDS = ('note_id', 'slug', 'revision')
+
+
+class ApiError(Exception):
+    """Ошибка запроса, которая отдаётся клиенту как {"detail": ...}."""
+
+    def __init__(self, detail, status=HTTPStatus.BAD_REQUEST):
+        super().__init__(detail)
+        self.detail = detail
+        self.status = status
+
+
+def json_response(data, status=HTTPStatus.OK):
+    return JsonResponse(
+        data,
+        status=status,
+        safe=False,
+        json_dumps_params={'ensure_ascii': False}
+    )
+
+
+def parse_fields(request):
+    """Поля из ?fields=, по умолчанию все."""
+    raw = request.GET.get('fields')
+    if not raw:
+        return NOTE_FIELDS
+    fields = tuple(dict.fromkeys(
+        name.strip() for name in raw.split(',') if name.strip()
+    ))
+    unknown = [name for name in fields if name not in NOTE_FIELDS]
+    if unknown:
+        raise ApiError(f'Неизвестные поля: {", ".join(unknown)}.')
+    return fields
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.API_PAGE_SIZE))
+    except ValueError:
+        raise ApiError('limit должен быть целым числом.')
+    if not 1 <= limit <= settings.API_MAX_PAGE_SIZE:
+        raise ApiError(
+            f'limit должен быть от 1 до {settings.API_MAX_PAGE_SIZE}.'
+        )
+    return limit
+
+
+def parse_cursor(request, name='after'):
+    try:
+        return int(request.GET.get(name, 0))
+    except ValueError:
+        raise ApiError('Некорректный курсор.')
+
+
+def parse_body(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except (UnicodeDecodeError, ValueError):
+        raise ApiError('Тело запроса должно быть JSON-объектом.')
+    if not isinstance(data, dict):
+        raise ApiError('Тело запроса должно быть JSON-объектом.')
+    return data
+
+
+def serialize(queryset, fields):
+    """Заметки queryset как словари с полями fields."""
+    return [dict(zip(fields, row)) for row in queryset.values_list(*fields)]
+
+
+def form_errors(form):
+    return json_response(
+        {'detail': 'Ошибка валидации.', 'errors': form.errors},
+        status=HTTPStatus.BAD_REQUEST
+    )
+
+
+class ApiMixin:
+    """Ответы с ошибками в JSON и сжатие gzip для представлений API."""
+
+    @method_decorator(gzip_page)
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return json_response(
+                {'detail': error.detail}, status=error.status
+            )
+        except Http404:
+            return json_response(
+                {'detail': 'Не найдено.'}, status=HTTPStatus.NOT_FOUND
+            )
+        except EditConflict:
+            return json_response(
+                {'detail': 'Заметка изменена другим запросом.'},
+                status=HTTPStatus.CONFLICT
+            )
+
+    def handle_no_permission(self):
+        return json_response(
+            {'detail': 'Требуется авторизация.'},
+            status=HTTPStatus.UNAUTHORIZED
+        )
+
+    def http_method_not_allowed(self, request, *args, **kwargs):
+        response = json_response(
+            {'detail': 'Метод не поддерживается.'},
+            status=HTTPStatus.METHOD_NOT_ALLOWED
+        )
+        response['Allow'] = ', '.join(self._allowed_methods())
+        return response
+
+
+class NotesApi(ApiMixin, NoteBase, RateLimitMixin, generic.View):
+    """Список заметок по возрастанию id и создание заметки."""
+
+    def get(self, request):
+        fields = parse_fields(request)
+        limit = parse_limit(request)
+        after = parse_cursor(request)
+        # id нужен для курсора, даже если его не запросили.
+        selected = fields if 'id' in fields else (*fields, 'id')
+        rows = serialize(
+            self.get_queryset().filter(id__gt=after).order_by('id')[
+                :limit + 1
+            ],
+            selected
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1]['id']
+        if selected is not fields:
+            for row in rows:
+                del row['id']
+        return json_response({'results': rows, 'next': next_cursor})
+
+    def post(self, request):
+        form = NoteForm(data=parse_body(request))
+        if not form.is_valid():
+            return form_errors(form)
+        note = form.save(commit=False)
+        note.author = request.user
+        note.save()
+        return json_response(
+            serialize(self.get_queryset().filter(pk=note.pk), NOTE_FIELDS)[0],
+            status=HTTPStatus.CREATED
+        )
+
+
+class NoteApi(
+        ApiMixin, NoteBase, generic.detail.SingleObjectMixin, generic.View
+):
+    """Чтение, изменение и удаление заметки по slug.
+
+    PATCH меняет только переданные поля, PUT требует все поля формы.
+    Если в теле передана version, заметка меняется только при совпадении
+    версии, иначе возвращается 409.
+    """
+
+    def get(self, request, slug):
+        fields = parse_fields(request)
+        rows = serialize(self.get_queryset().filter(slug=slug), fields)
+        if not rows:
+            raise Http404
+        return json_response(rows[0])
+
+    def put(self, request, slug, partial=False):
+        note = self.get_object()
+        data = parse_body(request)
+        if partial:
+            data = {
+                **{name: getattr(note, name) for name in NoteForm.Meta.fields},
+                **data,
+            }
+        form = NoteForm(data=data, instance=note)
+        if not form.is_valid():
+            return form_errors(form)
+        if 'slug' in form.changed_data:
+            notes_cache.slug_index.discard(form.initial['slug'])
+        form.save()
+        return json_response(
+            serialize(self.get_queryset().filter(pk=note.pk), NOTE_FIELDS)[0]
+        )
+
+    def patch(self, request, slug):
+        return self.put(request, slug, partial=True)
+
+    def delete(self, request, slug):
+        self.get_object().soft_delete()
+        return HttpResponse(status=HTTPStatus.NO_CONTENT)
+
+
+class NotesBulkApi(ApiMixin, NoteBase, generic.View):
+    """Заметки по списку slug одним запросом к БД.
+
+    Slug передаются в ?slugs= через запятую или в теле POST
+    как {"slugs": [...]}. Чужие и несуществующие slug попадают
+    в missing.
+    """
+
+    def get(self, request):
+        slugs = [
+            slug for slug in request.GET.get('slugs', '').split(',') if slug
+        ]
+        return self.bulk(request, slugs)
+
+    def post(self, request):
+        slugs = parse_body(request).get('slugs')
+        if not isinstance(slugs, list) or not all(
+            isinstance(slug, str) for slug in slugs
+        ):
+            raise ApiError('slugs должен быть списком строк.')
+        return self.bulk(request, slugs)
+
+    def bulk(self, request, slugs):
+        slugs = list(dict.fromkeys(slugs))
+        if len(slugs) > settings.API_MAX_BULK_SLUGS:
+            raise ApiError(
+                f'За один запрос можно получить не больше '
+                f'{settings.API_MAX_BULK_SLUGS} заметок.'
+            )
+        fields = parse_fields(request)
+        selected = fields if 'slug' in fields else (*fields, 'slug')
+        rows = serialize(
+            self.get_queryset().filter(slug__in=slugs), selected
+        ) if slugs else []
+        found = {row['slug'] for row in rows}
+        if selected is not fields:
+            for row in rows:
+                del row['slug']
+        return json_response({
+            'results': rows,
+            'missing': [slug for slug in slugs if slug not in found],
+        })
+
+
+class NoteChangesApi(ApiMixin, NoteBase, generic.View):
+    """Изменения заметок автора после ревизии ?since=.
+
+    Возвращает изменённые заметки и надгробия удалённых с ревизией
+    больше since в порядке ревизий, не больше ?limit= записей. Клиент
+    сохраняет token и передаёт его в since следующего запроса; при
+    has_more изменения нужно дозапросить сразу. Оба запроса идут
+    по индексам (author, revision).
+    """
+
+    def get(self, request):
+        since = parse_cursor(request, 'since')
+        limit = parse_limit(request)
+        fields = parse_fields(request)
+        selected = fields if 'revision' in fields else (*fields, 'revision')
+        notes = serialize(
+            self.get_queryset().filter(revision__gt=since).order_by(
+                'revision'
+            )[:limit + 1],
+            selected
+        )
+        deleted = serialize(
+            NoteTombstone.objects.filter(
+                author=request.user, revision__gt=since
+            ).order_by('revision')[:limit + 1],
+            TOMBSTONE_FIELDS
+        )
+        revisions = sorted(
+            row['revision'] for row in (*notes, *deleted)
+        )
+        has_more = len(revisions) > limit
+        token = revisions[:limit][-1] if revisions else since
+        notes = [row for row in notes if row['revision'] <= token]
+        deleted = [row for row in deleted if row['revision'] <= token]
+        if selected is not fields:
+            for row in notes:
+                del row['revision']
+        return json_response({
+            'notes': notes,
+            'deleted': deleted,
+            'token': token,
+            'has_more': has_more,
+        })
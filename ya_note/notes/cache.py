@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'notes:version:{author_id}'
+LIST_KEY = 'notes:list:{author_id}:{version}'
+DETAIL_KEY = 'notes:detail:{author_id}:{version}:{slug}'
+SLUG_KEY = 'notes:slug:{slug}'
+
+NoteRef = namedtuple('NoteRef', ('id', 'author_id'))
+
+
+def get_version(author_id):
+    """Текущая версия заметок автора.
+
+    Начальное значение берётся от времени, чтобы после вытеснения ключа
+    из кеша версия не совпала ни с одной из прежних.
+    """
+    key = VERSION_KEY.format(author_id=author_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def _incr_version(author_id):
+    key = VERSION_KEY.format(author_id=author_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+
+
+def bump_version(author_id):
+    """Делает устаревшими все закешированные заметки автора.
+
+    Версия повышается сразу и ещё раз после фиксации транзакции:
+    иначе параллельный запрос мог бы успеть положить в кеш
+    незафиксированное состояние под новой версией.
+    """
+    _incr_version(author_id)
+    transaction.on_commit(lambda: _incr_version(author_id))
+
+
+def get_note_list(author_id, queryset):
+    """Список заметок автора из кеша или из переданного queryset."""
+    key = LIST_KEY.format(
+        author_id=author_id, version=get_version(author_id)
+    )
+    notes = cache.get(key)
+    if notes is None:
+        notes = list(queryset)
+        cache.set(key, notes, settings.NOTES_CACHE_TIMEOUT)
+    return notes
+
+
+def get_note(author_id, slug, loader):
+    """Заметка автора по slug из кеша или из функции loader."""
+    key = DETAIL_KEY.format(
+        author_id=author_id, version=get_version(author_id), slug=slug
+    )
+    note = cache.get(key)
+    if note is None:
+        note = loader()
+        cache.set(key, note, settings.NOTES_CACHE_TIMEOUT)
+    return note
+
+
+class SlugIndex:
+    """Индекс slug → (id, author_id) для разрешения адресов заметок.
+
+    Общий кеш хранит индекс для всех процессов (поэтому он не может
+    быть кешем в памяти процесса, см. notes.checks), а локальный LRU
+    с коротким сроком жизни избавляет горячие заметки и от обращений
+    к общему кешу. Записи других процессов устаревают в локальном LRU
+    не дольше, чем за NOTES_SLUG_INDEX_LOCAL_TTL секунд; отказ по такой
+    записи перепроверяется по общему кешу через get(slug, local=False).
+    """
+
+    def __init__(self):
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, slug, local=True):
+        """Ссылка на заметку по slug или None, если её нет в индексе.
+
+        С local=False локальный LRU пропускается и обновляется
+        по общему кешу.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._local.get(slug) if local else None
+            if entry is not None and entry[1] > now:
+                self._local.move_to_end(slug)
+                return entry[0]
+        ref = cache.get(SLUG_KEY.format(slug=slug))
+        if ref is None:
+            with self._lock:
+                self._local.pop(slug, None)
+            return None
+        ref = NoteRef(*ref)
+        self._remember(slug, ref)
+        return ref
+
+    def set(self, slug, note_id, author_id):
+        """Запоминает, какой заметке и какому автору принадлежит slug."""
+        ref = NoteRef(note_id, author_id)
+        cache.set(
+            SLUG_KEY.format(slug=slug),
+            tuple(ref),
+            settings.NOTES_CACHE_TIMEOUT
+        )
+        self._remember(slug, ref)
+
+    def discard(self, slug):
+        """Удаляет slug из индекса."""
+        cache.delete(SLUG_KEY.format(slug=slug))
+        with self._lock:
+            self._local.pop(slug, None)
+
+    def clear_local(self):
+        """Очищает локальную часть индекса."""
+        with self._lock:
+            self._local.clear()
+
+    def _remember(self, slug, ref):
+        expires = time.monotonic() + settings.NOTES_SLUG_INDEX_LOCAL_TTL
+        with self._lock:
+            self._local[slug] = (ref, expires)
+            self._local.move_to_end(slug)
+            while len(self._local) > settings.NOTES_SLUG_INDEX_SIZE:
+                self._local.popitem(last=False)
+
+
+slug_index = SlugIndex()
@@ -0,0 +1,21 @@
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Кеш заметок не должен жить в памяти процесса.
+
+    Версии заметок и индекс slug сбрасываются только в кеше процесса,
+    который их изменил, и остальные процессы отдавали бы устаревшие
+    заметки.
+    """
+    if isinstance(caches['default'], LocMemCache):
+        return [Error(
+            'Кеш заметок хранится в памяти процесса.',
+            hint='Укажите в CACHES["default"] общий для процессов кеш: '
+                 'файловый, Memcached или Redis.',
+            id='notes.E001',
+        )]
+    return []
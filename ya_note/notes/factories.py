@@ -0,0 +1,90 @@
+"""Фабрики для массового создания данных в тестах и бенчмарках.
+
+Объекты создаются через bulk_create. SQLite не возвращает id
+из bulk_create, поэтому созданные объекты при fetch=True перечитываются
+одним запросом по диапазону первичных ключей.
+"""
+from collections import Counter
+from itertools import count as count_from, cycle, islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from . import cache as notes_cache
+from .models import Note, RevisionCounter
+
+# Ограничивает память при создании сотен тысяч объектов.
+CHUNK_SIZE = 50_000
+
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _bulk_create(model, objs, fetch):
+    last_pk = model.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first() or 0
+    objs = iter(objs)
+    while True:
+        chunk = list(islice(objs, CHUNK_SIZE))
+        if not chunk:
+            break
+        model.objects.bulk_create(chunk)
+    if fetch:
+        return list(model.objects.filter(pk__gt=last_pk).order_by('pk'))
+
+
+def make_users(count=None, usernames=None, fetch=True):
+    """Пользователи с именами usernames или user0 … user{count - 1}.
+
+    Всем пользователям назначается один непригодный для входа пароль,
+    чтобы не считать хеш на каждого.
+    """
+    if usernames is None:
+        usernames = (f'user{index}' for index in range(count))
+    User = get_user_model()
+    password = make_password(None)
+    return _bulk_create(
+        User,
+        (User(username=name, password=password) for name in usernames),
+        fetch
+    )
+
+
+def make_notes(authors, count, slug_prefix='note', fetch=True):
+    """Заметки со slug вида {slug_prefix}-{номер}.
+
+    authors — пользователь или список пользователей, заметки
+    распределяются по ним по кругу. Ревизии резервируются у счётчиков
+    авторов заранее, как при сохранении заметок по одной.
+    """
+    authors = _as_list(authors)
+    notes_per_author = Counter()
+    for position, author in enumerate(authors):
+        notes_per_author[author.pk] += (
+            count // len(authors) + (position < count % len(authors))
+        )
+    revisions = {}
+    for author_id, notes_count in notes_per_author.items():
+        if not notes_count:
+            continue
+        last = RevisionCounter.reserve(author_id, notes_count)
+        revisions[author_id] = count_from(last - notes_count + 1)
+    notes = _bulk_create(
+        Note,
+        (
+            Note(
+                title=f'Заметка {index}',
+                text='Текст заметки',
+                slug=f'{slug_prefix}-{index}',
+                author=author,
+                revision=next(revisions[author.pk])
+            )
+            for index, author in zip(range(count), cycle(authors))
+        ),
+        fetch
+    )
+    for author in authors:
+        notes_cache.bump_version(author.pk)
+    return notes
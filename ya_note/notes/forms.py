@@ -1,15 +1,45 @@
-from pytils.translit import slugify
-
 from django import forms
 from django.core.exceptions import ValidationError
 
+from .idempotency import IdempotencyKeyField
 from .models import Note
 
 WARNING = ' - такой slug уже существует, придумайте уникальное значение!'
+CONFLICT_WARNING = (
+    'Заметку изменили, пока вы её редактировали. Проверьте поля '
+    'и сохраните ещё раз, чтобы перезаписать изменения.'
+)
+
+
+class VersionedModelForm(forms.ModelForm):
+    """Форма для моделей с оптимистической блокировкой.
+
+    Версия, которую видел пользователь, передаётся в скрытом поле,
+    а при сохранении обновляются только изменённые поля.
+    """
+    version = forms.IntegerField(
+        widget=forms.HiddenInput, required=False, min_value=1
+    )
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk is not None:
+            self.initial.setdefault('version', self.instance.version)
 
-class NoteForm(forms.ModelForm):
+    def save(self, commit=True):
+        if not commit or self.instance._state.adding:
+            return super().save(commit)
+        if self.cleaned_data.get('version'):
+            self.instance.version = self.cleaned_data['version']
+        self.instance.save(update_fields=[
+            name for name in self.changed_data if name in self._meta.fields
+        ])
+        return self.instance
+
+
+class NoteForm(VersionedModelForm):
     """Форма для создания или обновления заметки."""
+    idempotency_key = IdempotencyKeyField()
 
     class Meta:
         model = Note
@@ -20,6 +50,8 @@ class NoteForm(forms.ModelForm):
         cleaned_data = super().clean()
         slug = cleaned_data.get('slug')
         if not slug:
+            from pytils.translit import slugify
+
             title = cleaned_data.get('title')
             slug = slugify(title)[:100]
         if Note.objects.filter(
@@ -0,0 +1,77 @@
+import secrets
+import time
+from http import HTTPStatus
+
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseRedirect
+
+CACHE_KEY = 'idempotency:{user_id}:{key}'
+FIELD_NAME = 'idempotency_key'
+# Метка в кеше, пока первая отправка формы ещё обрабатывается.
+IN_PROGRESS = ''
+POLL_INTERVAL = 0.05
+
+
+def new_key():
+    return secrets.token_urlsafe(16)
+
+
+class IdempotencyKeyField(forms.CharField):
+    """Скрытое поле с ключом отправки, новым при каждом показе формы."""
+    widget = forms.HiddenInput
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('required', False)
+        kwargs.setdefault('initial', new_key)
+        kwargs.setdefault('max_length', 64)
+        super().__init__(**kwargs)
+
+
+class IdempotentPostMixin:
+    """Не обрабатывает повторную отправку одной и той же формы.
+
+    Первая отправка занимает ключ формы в общем кеше через cache.add(),
+    а после перенаправления сохраняет под ним его адрес. Повторная
+    отправка с тем же ключом сразу перенаправляется туда же, до
+    валидации формы и обращений к БД. Если первая ещё не закончилась,
+    повторная ждёт её не дольше IDEMPOTENCY_WAIT_MS и иначе получает 409.
+    Ключ освобождается, если первая отправка не закончилась
+    перенаправлением, например из-за ошибок в форме.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        key = request.POST.get(FIELD_NAME) if request.method == 'POST' else ''
+        if not key or not request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        cache_key = CACHE_KEY.format(user_id=request.user.pk, key=key)
+        timeout = settings.IDEMPOTENCY_TIMEOUT
+        if not cache.add(cache_key, IN_PROGRESS, timeout):
+            response = self.replay(cache_key)
+            if response is not None:
+                return response
+            return super().dispatch(request, *args, **kwargs)
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        except Exception:
+            cache.delete(cache_key)
+            raise
+        if isinstance(response, HttpResponseRedirect):
+            cache.set(cache_key, response.url, timeout)
+        else:
+            cache.delete(cache_key)
+        return response
+
+    def replay(self, cache_key):
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_MS / 1000
+        url = cache.get(cache_key)
+        while url == IN_PROGRESS and time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            url = cache.get(cache_key)
+        if url == IN_PROGRESS:
+            return HttpResponse(status=HTTPStatus.CONFLICT)
+        if url is not None:
+            return HttpResponseRedirect(url)
+        # Первая отправка не удалась, обрабатываем эту как обычно.
+        return None
@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.purge import delete_users
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет пользователей вместе с заметками, удаляя заметки '
+        'порциями в отдельных транзакциях.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='+')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Количество заметок в одной транзакции.'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.05,
+            help='Пауза между транзакциями в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = User.objects.filter(
+            **{f'{User.USERNAME_FIELD}__in': options['usernames']}
+        )
+        found = set(users.values_list(User.USERNAME_FIELD, flat=True))
+        missing = set(options['usernames']) - found
+        if missing:
+            raise CommandError(
+                f'Пользователи не найдены: {", ".join(sorted(missing))}'
+            )
+        deleted = delete_users(
+            users, options['chunk_size'], options['pause']
+        )
+        self.stdout.write(
+            f'Удалено пользователей: {len(found)}, заметок: {deleted}'
+        )
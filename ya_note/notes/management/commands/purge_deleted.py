@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from notes.models import Note
+from notes.purge import delete_in_batches
+
+
+class Command(BaseCommand):
+    help = 'Окончательно удаляет заметки, помеченные удалёнными.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Количество заметок в одной транзакции.'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.05,
+            help='Пауза между транзакциями в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        purged = delete_in_batches(
+            Note.all_objects.filter(is_deleted=True),
+            options['chunk_size'],
+            options['pause']
+        )
+        self.stdout.write(f'Удалено заметок: {purged}')
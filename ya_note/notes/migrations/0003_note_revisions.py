@@ -0,0 +1,74 @@
+# Generated by Django 3.2.15 on 2026-10-19 16:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def number_existing_notes(apps, schema_editor):
+    """Нумерует уже существующие заметки каждого автора по порядку id."""
+    Note = apps.get_model('notes', 'Note')
+    RevisionCounter = apps.get_model('notes', 'RevisionCounter')
+    last_revisions = {}
+    batch = []
+    for note in Note.objects.order_by('author_id', 'id').only(
+        'id', 'author_id'
+    ).iterator():
+        note.revision = last_revisions.get(note.author_id, 0) + 1
+        last_revisions[note.author_id] = note.revision
+        batch.append(note)
+        if len(batch) == 1000:
+            Note.objects.bulk_update(batch, ['revision'])
+            batch = []
+    Note.objects.bulk_update(batch, ['revision'])
+    RevisionCounter.objects.bulk_create(
+        RevisionCounter(author_id=author_id, revision=revision)
+        for author_id, revision in last_revisions.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notes', '0002_note_updated'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('note_id', models.BigIntegerField()),
+                ('slug', models.SlugField(max_length=100)),
+                ('revision', models.PositiveBigIntegerField()),
+                ('deleted', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RevisionCounter',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('revision', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='revision',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['author', 'revision'], name='notes_note_author__a1fd30_idx'),
+        ),
+        migrations.AddField(
+            model_name='notetombstone',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='notetombstone',
+            index=models.Index(fields=['author', 'revision'], name='notes_notet_author__32e8e2_idx'),
+        ),
+        migrations.RunPython(number_existing_notes, migrations.RunPython.noop),
+    ]
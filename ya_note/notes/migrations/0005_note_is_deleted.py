@@ -0,0 +1,26 @@
+# Generated by Django 3.2.15 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0004_note_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='is_deleted',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(
+                condition=models.Q(('is_deleted', True)),
+                fields=['id'],
+                name='notes_note_deleted_idx'
+            ),
+        ),
+    ]
@@ -1,10 +1,118 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete
 
-from pytils.translit import slugify
 
+class RevisionCounter(models.Model):
+    """Последняя выданная ревизия заметок автора."""
+    author = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    revision = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def reserve(cls, author_id, count=1):
+        """Резервирует count ревизий автора и возвращает последнюю.
+
+        Вызывается в транзакции записи заметки: строка счётчика
+        остаётся заблокированной до фиксации, поэтому изменения одного
+        автора фиксируются в порядке возрастания ревизий.
+        """
+        with transaction.atomic():
+            counter = cls.objects.filter(author_id=author_id)
+            if not counter.update(revision=F('revision') + count):
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(author_id=author_id, revision=count)
+                    return count
+                except IntegrityError:
+                    counter.update(revision=F('revision') + count)
+            return counter.values_list('revision', flat=True).get()
+
+
+class EditConflict(Exception):
+    """Запись изменили после того, как её прочитали для правки."""
+
+
+class Versioned(models.Model):
+    """Оптимистическая блокировка по номеру версии.
+
+    UPDATE выполняется с условием WHERE version = n и увеличивает версию.
+    Если строку успели изменить, save() выбрасывает EditConflict;
+    дополнительный запрос делается только в этом случае, чтобы отличить
+    конфликт от удалённой строки.
+    """
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        self.version += 1
+        try:
+            # Точка сохранения не даёт конфликту испортить внешнюю
+            # транзакцию: save_base помечает её для отката при ошибке.
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except EditConflict:
+            self.version -= 1
+            raise
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields,
+                   forced_update):
+        filtered = base_qs.filter(pk=pk_val, version=self.version - 1)
+        updated = super()._do_update(
+            filtered, using, pk_val, values, update_fields, forced_update
+        )
+        if not updated and base_qs.filter(pk=pk_val).exists():
+            raise EditConflict
+        return updated
+
+
+class LiveManager(models.Manager):
+    """Менеджер, который не видит помеченные удалёнными строки."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
+class SoftDeletable(models.Model):
+    """Мягкое удаление: строка помечается и исчезает из objects.
+
+    Помеченные строки доступны через all_objects, физически их удаляет
+    команда purge_deleted небольшими транзакциями.
+    """
+    is_deleted = models.BooleanField(default=False, editable=False)
 
-class Note(models.Model):
+    objects = LiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        abstract = True
+
+    def soft_delete(self, **changes):
+        """Помечает строку удалённой одним UPDATE.
+
+        Отправляет post_delete, чтобы кеши сбросились так же,
+        как при настоящем удалении.
+        """
+        type(self).all_objects.filter(pk=self.pk).update(
+            is_deleted=True, **changes
+        )
+        self.is_deleted = True
+        post_delete.send(
+            sender=type(self), instance=self, using=self._state.db
+        )
+
+
+class Note(Versioned, SoftDeletable):
     title = models.CharField(
         'Заголовок',
         max_length=100,
@@ -27,12 +135,83 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
+    # Ревизия растёт при каждом изменении заметки, отдельно у каждого
+    # автора; по ней клиенты забирают только изменившиеся заметки.
+    revision = models.PositiveBigIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'revision')),
+            # Небольшой частичный индекс для поиска строк под удаление.
+            models.Index(
+                fields=('id',),
+                condition=models.Q(is_deleted=True),
+                name='notes_note_deleted_idx'
+            ),
+        )
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
         if not self.slug:
+            # pytils импортируется при первой генерации slug,
+            # а не при запуске процесса.
+            from pytils.translit import slugify
+
             max_slug_length = self._meta.get_field('slug').max_length
             self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {
+                *kwargs['update_fields'], 'revision', 'updated'
+            }
+        with transaction.atomic():
+            self.revision = RevisionCounter.reserve(self.author_id)
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """Удаляет заметку и оставляет надгробие для синхронизации."""
+        with transaction.atomic():
+            self._bury()
+            return super().delete(*args, **kwargs)
+
+    def soft_delete(self):
+        """Помечает заметку удалённой и оставляет надгробие.
+
+        Slug заменяется на ~id, чтобы автор сразу мог занять его снова;
+        по такому адресу заметку не открыть.
+        """
+        with transaction.atomic():
+            self._bury()
+            super().soft_delete(slug=f'~{self.pk}')
+
+    def _bury(self):
+        NoteTombstone.objects.create(
+            author_id=self.author_id,
+            note_id=self.pk,
+            slug=self.slug,
+            revision=RevisionCounter.reserve(self.author_id)
+        )
+
+
+class NoteTombstone(models.Model):
+    """След удалённой заметки для клиентов, синхронизирующих изменения.
+
+    Надгробия пишут Note.soft_delete(), то есть удаление со страницы
+    заметки, через API и действием в списке админки, и Note.delete()
+    при удалении в админке по одной.
+    Каскадное удаление вместе с пользователем надгробий не оставляет.
+    """
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    note_id = models.BigIntegerField()
+    slug = models.SlugField(max_length=100)
+    revision = models.PositiveBigIntegerField()
+    deleted = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = (models.Index(fields=('author', 'revision')),)
@@ -0,0 +1,65 @@
+import time
+
+from django.db import transaction
+
+from . import cache as notes_cache
+from .models import Note, NoteTombstone
+
+
+def delete_in_batches(queryset, chunk_size=1000, pause=0, on_batch=None):
+    """Удаляет строки queryset порциями по chunk_size.
+
+    Каждая порция удаляется своей транзакцией одним DELETE без сигналов
+    и каскадов, так что SQLite не блокируется на всё удаление, а между
+    порциями можно сделать паузу в pause секунд. Подходит только для
+    моделей, на которые никто не ссылается. on_batch, если задан,
+    вызывается со списком pk каждой порции перед её удалением.
+    Возвращает количество удалённых строк.
+    """
+    model = queryset.model
+    # Порядок не нужен: удалённые строки в следующую порцию не попадут,
+    # а без сортировки LIMIT останавливается на первых найденных строках.
+    pks = queryset.order_by().values_list('pk', flat=True)
+    deleted = 0
+    while True:
+        with transaction.atomic(using=queryset.db):
+            batch = list(pks[:chunk_size])
+            if batch:
+                if on_batch is not None:
+                    on_batch(batch)
+                deleted += model._base_manager.using(
+                    queryset.db
+                ).filter(pk__in=batch)._raw_delete(queryset.db)
+        if len(batch) < chunk_size:
+            return deleted
+        if pause:
+            time.sleep(pause)
+
+
+def _unindex_notes(pks):
+    for slug in Note._base_manager.filter(pk__in=pks).values_list(
+        'slug', flat=True
+    ):
+        notes_cache.slug_index.discard(slug)
+
+
+def delete_users(users, chunk_size=1000, pause=0):
+    """Удаляет пользователей queryset users вместе с заметками.
+
+    Заметки и надгробия удаляются порциями через delete_in_batches,
+    поэтому память и время блокировки не зависят от их количества,
+    а сами пользователи — обычным delete() уже без тяжёлого каскада.
+    Slug удалённых заметок убираются из индекса. Возвращает количество
+    удалённых заметок.
+    """
+    user_ids = list(users.values_list('pk', flat=True))
+    deleted = delete_in_batches(
+        Note._base_manager.filter(author_id__in=user_ids),
+        chunk_size, pause, on_batch=_unindex_notes
+    )
+    delete_in_batches(
+        NoteTombstone.objects.filter(author_id__in=user_ids),
+        chunk_size, pause
+    )
+    users.model._base_manager.filter(pk__in=user_ids).delete()
+    return deleted
@@ -0,0 +1,121 @@
+import time
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+CACHE_KEY = 'ratelimit:{key}'
+MAX_LOCAL_KEYS = 100_000
+
+_buckets = {}
+
+
+class LocalTokenBucket:
+    """Токен-бакет в памяти процесса без блокировок.
+
+    Состояние ключа — кортеж (токены, время), который заменяется целиком
+    одним присваиванием в словаре. Гонка двух потоков может пропустить
+    лишний запрос, но не испортит состояние.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._state = {}
+
+    def allow(self, key):
+        now = time.monotonic()
+        tokens, updated = self._state.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._state[key] = (tokens, now)
+        if len(self._state) > MAX_LOCAL_KEYS:
+            self._prune(now)
+        return allowed
+
+    def reset(self):
+        self._state = {}
+
+    def _prune(self, now):
+        """Забывает ключи, чьи бакеты уже успели наполниться."""
+        full_after = self.burst / self.rate
+        self._state = {
+            key: state for key, state in list(self._state.items())
+            if now - state[1] < full_after
+        }
+
+
+class CacheTokenBucket:
+    """Токен-бакет в общем кеше для нескольких процессов.
+
+    Чтение и запись не атомарны, поэтому при одновременных запросах
+    с разных процессов лимит соблюдается приблизительно.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+
+    def allow(self, key):
+        now = time.time()
+        cache_key = CACHE_KEY.format(key=key)
+        tokens, updated = cache.get(cache_key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        cache.set(
+            cache_key,
+            (tokens, now),
+            int(self.burst / self.rate) + 1
+        )
+        return allowed
+
+    def reset(self):
+        pass
+
+
+BACKENDS = {
+    'local': LocalTokenBucket,
+    'cache': CacheTokenBucket,
+}
+
+
+def get_bucket():
+    """Бакет для текущих настроек RATELIMIT_*."""
+    params = (
+        settings.RATELIMIT_BACKEND,
+        settings.RATELIMIT_RATE,
+        settings.RATELIMIT_BURST,
+    )
+    bucket = _buckets.get(params)
+    if bucket is None:
+        backend, rate, burst = params
+        bucket = _buckets[params] = BACKENDS[backend](rate, burst)
+    return bucket
+
+
+def reset():
+    """Сбрасывает состояние всех бакетов процесса."""
+    for bucket in _buckets.values():
+        bucket.reset()
+
+
+class RateLimitMixin:
+    """Ограничивает частоту POST-запросов пользователя и IP-адреса.
+
+    Превысившие лимит получают 429 до валидации формы и обращений к БД.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method == 'POST' and settings.RATELIMIT_ENABLED:
+            bucket = get_bucket()
+            allowed = bucket.allow(f'ip:{request.META.get("REMOTE_ADDR")}')
+            if request.user.is_authenticated:
+                allowed &= bucket.allow(f'user:{request.user.pk}')
+            if not allowed:
+                return HttpResponse(status=HTTPStatus.TOO_MANY_REQUESTS)
+        return super().dispatch(request, *args, **kwargs)
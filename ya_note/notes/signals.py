@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache as notes_cache
+from .backends import forget_user
+from .models import Note
+
+
+@receiver((post_save, post_delete), sender=Note)
+def invalidate_author_notes(sender, instance, **kwargs):
+    """Сбрасывает кеш заметок автора при любом изменении заметки."""
+    notes_cache.bump_version(instance.author_id)
+
+
+@receiver(post_save, sender=Note)
+def index_note_slug(sender, instance, **kwargs):
+    """Обновляет индекс slug после фиксации сохранения заметки.
+
+    Сохранение, откаченное вместе с транзакцией, индекс не меняет.
+    """
+    slug, note_id, author_id = instance.slug, instance.id, instance.author_id
+    transaction.on_commit(
+        lambda: notes_cache.slug_index.set(slug, note_id, author_id)
+    )
+
+
+@receiver(post_delete, sender=Note)
+def unindex_note_slug(sender, instance, **kwargs):
+    """Убирает slug удалённой заметки из индекса после фиксации."""
+    slug = instance.slug
+    transaction.on_commit(lambda: notes_cache.slug_index.discard(slug))
+
+
+@receiver((post_save, post_delete), sender=get_user_model())
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Сбрасывает закешированного пользователя при его изменении."""
+    forget_user(instance.pk)
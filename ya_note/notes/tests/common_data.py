@@ -1,11 +1,12 @@
-from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 
+from notes import ratelimit
+from notes.cache import slug_index
+from notes.factories import make_users
 from notes.models import Note
 
-User = get_user_model()
-
 
 class BaseTestCase(TestCase):
     """Базовый класс для тестов."""
@@ -22,10 +23,11 @@ class BaseTestCase(TestCase):
     @classmethod
     def setUpTestData(cls):
         """Создание объектов для тестирования."""
-        cls.author = User.objects.create(username='Автор')
+        cls.author, cls.not_author = make_users(
+            usernames=('Автор', 'Не автор')
+        )
         cls.author_client = Client()
         cls.author_client.force_login(cls.author)
-        cls.not_author = User.objects.create(username='Не автор')
         cls.not_author_client = Client()
         cls.not_author_client.force_login(cls.not_author)
         cls.note = Note.objects.create(
@@ -40,5 +42,12 @@ class BaseTestCase(TestCase):
             'slug': cls.NOTE_SLUG
         }
         cls.url_to_success = reverse('notes:success')
+        cls.url_detail = reverse('notes:detail', args=(cls.note.slug,))
         cls.url_edit = reverse('notes:edit', args=(cls.note.slug,))
         cls.url_delete = reverse('notes:delete', args=(cls.note.slug,))
+
+    def setUp(self):
+        """Кеш и лимиты запросов не должны переживать тест."""
+        cache.clear()
+        slug_index.clear_local()
+        ratelimit.reset()
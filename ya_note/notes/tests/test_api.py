@@ -0,0 +1,163 @@
+from http import HTTPStatus
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.factories import make_notes
+from notes.forms import WARNING
+from notes.models import Note
+from .common_data import BaseTestCase
+
+
+class TestNotesApi(BaseTestCase):
+    """Класс проверки JSON API заметок."""
+
+    URL_API_LIST = reverse('notes:api_list')
+    URL_API_BULK = reverse('notes:api_bulk')
+    URL_API_CHANGES = reverse('notes:api_changes')
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление заметок обоим пользователям."""
+        super().setUpTestData()
+        cls.author_notes = make_notes(cls.author, 5, slug_prefix='author')
+        cls.foreign_notes = make_notes(cls.not_author, 2, slug_prefix='other')
+        cls.url_api_detail = reverse('notes:api_detail', args=(cls.NOTE_SLUG,))
+
+    def test_list_pages_contain_only_own_notes(self):
+        """Постраничный список содержит все заметки автора и только их."""
+        params = {'fields': 'slug', 'limit': 2}
+        slugs = []
+        while True:
+            page = self.author_client.get(self.URL_API_LIST, params).json()
+            slugs += [note['slug'] for note in page['results']]
+            if page['next'] is None:
+                break
+            params['after'] = page['next']
+        self.assertEqual(
+            sorted(slugs),
+            sorted(
+                Note.objects.filter(author=self.author).values_list(
+                    'slug', flat=True
+                )
+            ),
+            msg='В списке API не все заметки автора или есть чужие.'
+        )
+
+    def test_create_uses_form_validation(self):
+        """Создание заметки проверяется той же формой, что и на сайте."""
+        response = self.author_client.post(
+            self.URL_API_LIST, self.form_data, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(
+            response.json()['errors'], {'slug': [self.NOTE_SLUG + WARNING]}
+        )
+        response = self.author_client.post(
+            self.URL_API_LIST,
+            {**self.form_data, 'slug': 'new_slug'},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertTrue(
+            Note.objects.filter(slug='new_slug', author=self.author).exists()
+        )
+
+    def test_update_only_by_author(self):
+        """Изменить заметку через API может только её автор."""
+        clients = (
+            (self.client, HTTPStatus.UNAUTHORIZED),
+            (self.not_author_client, HTTPStatus.NOT_FOUND),
+            (self.author_client, HTTPStatus.OK),
+        )
+        for client, status in clients:
+            with self.subTest(client=client, status=status):
+                response = client.patch(
+                    self.url_api_detail,
+                    {'title': self.NOTE_NEW_TITLE},
+                    content_type='application/json'
+                )
+                self.assertEqual(response.status_code, status)
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.title, self.NOTE_NEW_TITLE)
+        self.assertEqual(self.note.text, self.NOTE_TEXT)
+
+    def test_delete_by_author(self):
+        """Автор может удалить заметку через API."""
+        response = self.author_client.delete(self.url_api_detail)
+        self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+        self.assertFalse(Note.objects.filter(pk=self.note.pk).exists())
+
+    def test_bulk_by_slugs_in_one_query(self):
+        """Заметки по списку slug выдаются одним запросом к таблице.
+
+        Чужие и несуществующие slug возвращаются в missing.
+        """
+        own = [note.slug for note in self.author_notes]
+        requested = [*own, self.foreign_notes[0].slug, 'missing']
+        with CaptureQueriesContext(connection) as context:
+            response = self.author_client.post(
+                self.URL_API_BULK,
+                {'slugs': requested},
+                content_type='application/json'
+            )
+        notes_queries = [
+            query for query in context.captured_queries
+            if 'notes_note' in query['sql']
+        ]
+        data = response.json()
+        self.assertEqual(len(notes_queries), 1)
+        self.assertEqual(
+            sorted(note['slug'] for note in data['results']), sorted(own)
+        )
+        self.assertEqual(
+            data['missing'], [self.foreign_notes[0].slug, 'missing']
+        )
+
+    def get_changes(self, since, **params):
+        """Все изменения после since, собранные по страницам."""
+        notes, deleted = [], []
+        while True:
+            page = self.author_client.get(
+                self.URL_API_CHANGES, {'since': since, **params}
+            ).json()
+            notes += page['notes']
+            deleted += page['deleted']
+            since = page['token']
+            if not page['has_more']:
+                return notes, deleted, since
+
+    def test_changes_since_token(self):
+        """Синхронизация по токену возвращает только новые изменения.
+
+        Правка, создание и удаление заметок со страниц сайта попадают
+        в выдачу один раз, удалённые заметки — в deleted.
+        """
+        notes, deleted, token = self.get_changes(0, limit=2)
+        self.assertEqual(len(notes), len(self.author_notes) + 1)
+        self.assertEqual(deleted, [])
+        edited, removed = self.author_notes[:2]
+        self.author_client.post(
+            reverse('notes:edit', args=(edited.slug,)),
+            {'title': self.NOTE_NEW_TITLE, 'text': edited.text,
+             'slug': edited.slug}
+        )
+        self.author_client.post(reverse('notes:delete', args=(removed.slug,)))
+        self.author_client.post(
+            self.URL_ADD, {**self.form_data, 'slug': 'created'}
+        )
+        notes, deleted, new_token = self.get_changes(token, limit=1)
+        self.assertEqual(
+            [note['slug'] for note in notes], [edited.slug, 'created']
+        )
+        self.assertEqual(
+            [(row['note_id'], row['slug']) for row in deleted],
+            [(removed.pk, removed.slug)]
+        )
+        self.assertGreater(new_token, token)
+        self.assertEqual(
+            self.get_changes(new_token)[:2],
+            ([], []),
+            msg='Изменения выдаются повторно после нового токена.'
+        )
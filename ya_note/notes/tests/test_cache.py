@@ -0,0 +1,169 @@
+from http import HTTPStatus
+
+from django.db import DatabaseError, connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from notes.cache import NoteRef, slug_index
+from notes.checks import check_shared_cache
+from .common_data import BaseTestCase
+
+
+class TestNotesCache(BaseTestCase):
+    """Класс проверки кеширования заметок."""
+
+    def get_notes_queries(self, url):
+        """Запрос к странице и список запросов к таблице заметок."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.author_client.get(url)
+        notes_queries = [
+            query['sql'] for query in context.captured_queries
+            if 'notes_note' in query['sql']
+        ]
+        return response, notes_queries
+
+    def test_repeated_pages_skip_notes_table(self):
+        """Повторные запросы списка и заметки не обращаются к таблице."""
+        for url in (self.URL_NOTES_PAGE, self.url_detail):
+            with self.subTest(url=url):
+                self.get_notes_queries(url)
+                response, notes_queries = self.get_notes_queries(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertEqual(
+                    notes_queries,
+                    [],
+                    msg='Повторный запрос не использует кеш заметок.'
+                )
+
+    def test_list_after_edit_and_delete(self):
+        """После изменения или удаления список не бывает устаревшим."""
+        self.author_client.get(self.URL_NOTES_PAGE)
+        self.author_client.post(self.url_edit, data=self.form_data)
+        response = self.author_client.get(self.URL_NOTES_PAGE)
+        titles = [note.title for note in response.context['object_list']]
+        self.assertEqual(
+            titles,
+            [self.NOTE_NEW_TITLE],
+            msg='После редактирования в списке старое название.'
+        )
+        self.author_client.post(self.url_delete)
+        response = self.author_client.get(self.URL_NOTES_PAGE)
+        self.assertEqual(
+            list(response.context['object_list']),
+            [],
+            msg='После удаления заметка осталась в списке.'
+        )
+
+    def test_detail_after_edit_and_delete(self):
+        """После изменения или удаления заметка не бывает устаревшей."""
+        self.author_client.get(self.url_detail)
+        self.author_client.post(self.url_edit, data=self.form_data)
+        response = self.author_client.get(self.url_detail)
+        self.assertEqual(
+            response.context['note'].title,
+            self.NOTE_NEW_TITLE,
+            msg='После редактирования отображается старая заметка.'
+        )
+        self.author_client.post(self.url_delete)
+        response = self.author_client.get(self.url_detail)
+        self.assertEqual(
+            response.status_code,
+            HTTPStatus.NOT_FOUND,
+            msg='После удаления заметка доступна из кеша.'
+        )
+
+    def test_cache_is_per_author(self):
+        """Закешированная заметка автора недоступна другому пользователю."""
+        self.author_client.get(self.url_detail)
+        response = self.not_author_client.get(self.url_detail)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_foreign_note_404_without_notes_query(self):
+        """Чужая известная заметка отдаёт 404 без запроса к заметкам."""
+        self.author_client.get(self.url_detail)
+        for url in (self.url_detail, self.url_edit, self.url_delete):
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as context:
+                    response = self.not_author_client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+                self.assertFalse(
+                    any(
+                        'notes_note' in query['sql']
+                        for query in context.captured_queries
+                    ),
+                    msg='Проверка владельца выполняет запрос к заметкам.'
+                )
+
+    def test_stale_local_slug_entry_is_rechecked(self):
+        """Устаревшая локальная запись индекса не отдаёт 404 владельцу.
+
+        Если slug в другом процессе перешёл к автору, а локальный LRU
+        ещё помнит прежнего владельца, решение принимается по общему кешу.
+        """
+        slug_index.set(self.NOTE_SLUG, self.note.id, self.author.id)
+        slug_index._remember(
+            self.NOTE_SLUG, NoteRef(self.note.id, self.not_author.id)
+        )
+        response = self.author_client.get(self.url_detail)
+        self.assertEqual(
+            response.status_code, HTTPStatus.OK,
+            msg='Устаревшая локальная запись индекса отдала 404 владельцу.'
+        )
+
+    def test_rolled_back_save_keeps_slug_index(self):
+        """Откаченное сохранение заметки не попадает в индекс slug."""
+        self.note.slug = 'new_slug'
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(DatabaseError):
+                with transaction.atomic():
+                    self.note.save()
+                    raise DatabaseError
+        self.assertIsNone(
+            slug_index.get('new_slug'),
+            msg='Индекс slug указывает на несохранённую заметку.'
+        )
+
+    def test_slug_change_drops_old_slug(self):
+        """После смены slug старый адрес удаляется из индекса."""
+        self.author_client.get(self.url_detail)
+        self.author_client.post(
+            self.url_edit, data={**self.form_data, 'slug': 'new_slug'}
+        )
+        self.assertIsNone(
+            slug_index.get(self.NOTE_SLUG),
+            msg='Индекс slug не сброшен после смены адреса заметки.'
+        )
+        response = self.author_client.get(self.url_detail)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_warm_list_without_queries(self):
+        """Повторный запрос списка не обращается к БД вовсе.
+
+        Сессия, пользователь и заметки берутся из кеша.
+        """
+        self.author_client.get(self.URL_NOTES_PAGE)
+        with self.assertNumQueries(0):
+            self.author_client.get(self.URL_NOTES_PAGE)
+
+    def test_password_change_resets_cached_user(self):
+        """После смены пароля старая сессия перестаёт действовать."""
+        self.author_client.get(self.URL_NOTES_PAGE)
+        self.author.set_password('new_password')
+        self.author.save()
+        response = self.author_client.get(self.URL_NOTES_PAGE)
+        self.assertEqual(
+            response.status_code,
+            HTTPStatus.FOUND,
+            msg='После смены пароля используется закешированный пользователь.'
+        )
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }})
+    def test_local_memory_cache_is_rejected(self):
+        """Кеш в памяти процесса не проходит проверку notes.E001."""
+        self.assertEqual(
+            [error.id for error in check_shared_cache(None)],
+            ['notes.E001'],
+            msg='Кеш заметок в памяти процесса не отклоняется.'
+        )
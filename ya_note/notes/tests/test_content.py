@@ -1,3 +1,5 @@
+from http import HTTPStatus
+
 from notes.forms import NoteForm
 from .common_data import BaseTestCase
 
@@ -59,3 +61,32 @@ class TestNotePage(BaseTestCase):
             NoteForm,
             'Неавторизованному пользователю доступна форма для заметки.'
         )
+
+    def test_note_detail_not_modified(self):
+        """Проверка условных запросов к странице заметки.
+
+        Неизменившаяся заметка отдаётся как 304 без рендеринга шаблона
+        и с запретом хранения в общих кешах, а после правки заметки
+        прежний ETag перестаёт совпадать.
+        """
+        response = self.author_client.get(self.url_detail)
+        etag = response['ETag']
+        self.assertIn('private', response['Cache-Control'])
+        response = self.author_client.get(
+            self.url_detail, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertEqual(
+            response.templates,
+            [],
+            msg='Неизменившаяся заметка рендерится заново.'
+        )
+        self.author_client.post(self.url_edit, data=self.form_data)
+        response = self.author_client.get(
+            self.url_detail, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(
+            response.status_code,
+            HTTPStatus.OK,
+            msg='После правки заметки её страница не обновилась.'
+        )
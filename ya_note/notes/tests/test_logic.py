@@ -1,9 +1,19 @@
 from http import HTTPStatus
+from io import StringIO
 
 from pytils.translit import slugify
 
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.cache import slug_index
+from notes.factories import make_notes
 from notes.forms import WARNING
-from notes.models import Note
+from notes.models import Note, NoteTombstone
 from .common_data import BaseTestCase
 
 
@@ -39,6 +49,25 @@ class TestNoteCreation(BaseTestCase):
                 notes_count = Note.objects.count()
                 self.assertEqual(notes_count, note_in_list, msg=msg)
 
+    def test_double_submit_creates_one_note(self):
+        """Проверка повторной отправки формы заметки.
+
+        Вторая отправка с тем же ключом перенаправляется туда же, куда
+        и первая, без ошибки о занятом slug и без второй заметки.
+        """
+        form = self.author_client.get(self.URL_ADD).context['form']
+        data = {
+            **self.form_data,
+            'idempotency_key': form['idempotency_key'].value(),
+        }
+        self.author_client.post(self.URL_ADD, data=data)
+        response = self.author_client.post(self.URL_ADD, data=data)
+        self.assertRedirects(response, self.url_to_success)
+        self.assertEqual(
+            Note.objects.count(), 1,
+            msg='Повторная отправка формы создала вторую заметку!'
+        )
+
     def test_create_note_with_empty_slug(self):
         """Проверка транслитерации названия заметки в slug.
 
@@ -90,6 +119,46 @@ class TestNoteEditDelete(BaseTestCase):
             msg='Автор не смог удалить свою заметку!'
         )
 
+    def test_deleted_note_frees_slug_until_purged(self):
+        """Проверка мягкого удаления заметки.
+
+        Slug удалённой заметки сразу можно занять снова, надгробие
+        остаётся, а строку из таблицы удаляет команда purge_deleted.
+        """
+        self.author_client.delete(self.url_delete)
+        self.assertTrue(NoteTombstone.objects.filter(
+            note_id=self.note.pk, slug=self.NOTE_SLUG
+        ).exists())
+        self.author_client.post(self.URL_ADD, data=self.form_data)
+        self.assertEqual(
+            Note.objects.get().slug, self.NOTE_SLUG,
+            msg='Slug удалённой заметки не освободился!'
+        )
+        call_command('purge_deleted', '--pause=0', stdout=StringIO())
+        self.assertFalse(
+            Note.all_objects.filter(pk=self.note.pk).exists(),
+            msg='Команда purge_deleted не удалила помеченную заметку!'
+        )
+
+    def test_admin_bulk_delete_leaves_tombstones(self):
+        """Проверка удаления заметок действием в списке админки.
+
+        Удалённая действием заметка оставляет надгробие для клиентов
+        синхронизации.
+        """
+        self.not_author.is_staff = self.not_author.is_superuser = True
+        self.not_author.save()
+        self.not_author_client.post(reverse('admin:notes_note_changelist'), {
+            'action': 'delete_selected',
+            '_selected_action': self.note.pk,
+            'post': 'yes',
+        })
+        self.assertFalse(Note.objects.exists())
+        self.assertTrue(
+            NoteTombstone.objects.filter(note_id=self.note.pk).exists(),
+            msg='Удаление в списке админки не оставило надгробия.'
+        )
+
     def test_user_cant_delete_another_note(self):
         """Проверка невозможности удаления чужих заметок."""
         response = self.not_author_client.delete(self.url_delete)
@@ -112,6 +181,34 @@ class TestNoteEditDelete(BaseTestCase):
             msg='Автор не смог отредактировать свою заметку!'
         )
 
+    def test_concurrent_edit_is_rejected(self):
+        """Проверка оптимистической блокировки заметки.
+
+        Правка по устаревшей версии не перезаписывает чужие изменения,
+        а возвращает форму с ошибкой и кодом 409.
+        """
+        stale_version = self.note.version
+        self.author_client.post(
+            self.url_edit, data={**self.form_data, 'version': stale_version}
+        )
+        response = self.author_client.post(
+            self.url_edit,
+            data={
+                **self.form_data,
+                'text': 'Устаревшая правка',
+                'version': stale_version,
+            }
+        )
+        self.note.refresh_from_db()
+        self.assertEqual(response.status_code, HTTPStatus.CONFLICT)
+        self.assertEqual(
+            self.note.text, self.NOTE_NEW_TEXT,
+            msg='Правка по устаревшей версии перезаписала заметку!'
+        )
+        self.assertEqual(
+            response.context['form']['version'].value(), self.note.version
+        )
+
     def test_user_cant_edit_another_note(self):
         """Проверка невозможности редактирования чужих заметок."""
         response = self.not_author_client.post(
@@ -125,3 +222,72 @@ class TestNoteEditDelete(BaseTestCase):
             (self.NOTE_TITLE, self.NOTE_TEXT),
             msg='Пользователь смог отредактировать чужую заметку!'
         )
+
+
+class TestNoteFlood(BaseTestCase):
+    """Класс проверки ограничения частоты создания заметок."""
+
+    @override_settings(RATELIMIT_BURST=1)
+    def test_note_flood_is_limited(self):
+        """Сверх допустимого количества подряд возвращается 429."""
+        form_data = {'title': self.NOTE_TITLE, 'text': self.NOTE_TEXT}
+        self.author_client.post(self.URL_ADD, data=form_data)
+        response = self.author_client.post(self.URL_ADD, data=form_data)
+        self.assertEqual(
+            response.status_code,
+            HTTPStatus.TOO_MANY_REQUESTS,
+            msg='Заметки создаются сверх ограничения частоты.'
+        )
+        self.assertEqual(Note.objects.count(), 2)
+
+
+class TestUserDeletion(BaseTestCase):
+    """Класс проверки удаления пользователей с заметками."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Дополнительно создаёт автору ещё девять заметок."""
+        super().setUpTestData()
+        make_notes(cls.author, 9, fetch=False)
+
+    def test_admin_deletes_user_with_notes(self):
+        """Проверка удаления пользователя с заметками в админке.
+
+        Страница подтверждения показывает количество заметок, после
+        подтверждения удаляются и пользователь, и заметки.
+        """
+        self.not_author.is_staff = self.not_author.is_superuser = True
+        self.not_author.save()
+        url = reverse('admin:auth_user_changelist')
+        data = {
+            'action': 'delete_with_notes',
+            '_selected_action': self.author.pk,
+        }
+        response = self.not_author_client.post(url, data)
+        self.assertEqual(response.context['note_count'], 10)
+        self.not_author_client.post(url, {**data, 'post': 'yes'})
+        self.assertFalse(Note.all_objects.exists())
+        self.assertFalse(
+            get_user_model().objects.filter(pk=self.author.pk).exists()
+        )
+
+    def test_delete_users_command_deletes_in_batches(self):
+        """Проверка порционного удаления заметок пользователя.
+
+        Slug удалённых заметок пропадают из индекса.
+        """
+        slug_index.set(self.NOTE_SLUG, self.note.id, self.author.id)
+        with CaptureQueriesContext(connection) as context:
+            call_command(
+                'delete_users', self.author.username, '--chunk-size=3',
+                '--pause=0', stdout=StringIO()
+            )
+        deletes = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('DELETE FROM "notes_note"')
+        ]
+        self.assertEqual(
+            len(deletes), 4, msg='Заметки удаляются не порциями.'
+        )
+        self.assertFalse(Note.all_objects.exists())
+        self.assertIsNone(slug_index.get(self.NOTE_SLUG))
@@ -0,0 +1,74 @@
+import re
+from http import HTTPStatus
+
+from django.urls import reverse
+
+from .common_data import BaseTestCase
+
+SAMPLE = re.compile(r'^(?P<name>\w+)(?P<labels>\{.*\})? (?P<value>\S+)$')
+
+
+class TestMetrics(BaseTestCase):
+    """Класс проверки метрик в формате Prometheus."""
+
+    URL_METRICS = reverse('metrics')
+
+    def scrape(self):
+        """Значения метрик по строкам «имя{метки}»."""
+        response = self.client.get(self.URL_METRICS)
+        self.assertTrue(
+            response['Content-Type'].startswith('text/plain; version=0.0.4')
+        )
+        samples = {}
+        for line in response.content.decode().splitlines():
+            if line.startswith('#'):
+                continue
+            match = SAMPLE.match(line)
+            self.assertIsNotNone(
+                match, msg=f'Строка не в формате Prometheus: {line}'
+            )
+            samples[match['name'] + (match['labels'] or '')] = float(
+                match['value']
+            )
+        return samples
+
+    def test_metrics_scrape(self):
+        """Проверка сбора метрик по маршрутам.
+
+        После запросов к списку и странице заметки в метриках растут
+        счётчики ответов, запросов к БД, отрисовок шаблонов и чтений кеша.
+        """
+        before = self.scrape()
+        self.author_client.get(self.URL_NOTES_PAGE)
+        self.author_client.get(self.url_detail)
+        after = self.scrape()
+
+        def grew(sample):
+            return after.get(sample, 0) > before.get(sample, 0)
+
+        for view in ('notes:list', 'notes:detail'):
+            label = f'{{view="{view}"}}'
+            with self.subTest(view=view):
+                self.assertTrue(
+                    grew(f'django_request_duration_seconds_count{label}')
+                )
+                self.assertTrue(grew(
+                    f'django_request_duration_seconds_bucket'
+                    f'{{view="{view}",le="+Inf"}}'
+                ))
+                self.assertTrue(
+                    grew(f'django_template_render_seconds_count{label}')
+                )
+                self.assertTrue(grew(f'django_db_queries_total{label}'))
+                self.assertTrue(any(
+                    grew(
+                        f'django_cache_requests_total'
+                        f'{{view="{view}",result="{result}"}}'
+                    )
+                    for result in ('hit', 'miss')
+                ))
+
+    def test_metrics_are_private(self):
+        """Метрики недоступны с адресов не из METRICS_ALLOWED_IPS."""
+        response = self.client.get(self.URL_METRICS, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.cache import slug_index
+from notes.factories import make_notes
+from .common_data import BaseTestCase
+
+
+class TestQueryCount(BaseTestCase):
+    """Класс проверки количества запросов к БД."""
+
+    DATASET_SIZES = (1, 10, 50)
+
+    def test_query_count_does_not_grow(self):
+        """Число запросов на странице не зависит от количества заметок.
+
+        Каждый замер делается с пустым кешем, чтобы N+1 в шаблонах
+        и представлениях не прятался за кешем.
+        """
+        urls = (
+            ('notes:home', None),
+            ('notes:add', None),
+            ('notes:list', None),
+            ('notes:success', None),
+            ('notes:detail', (self.note.slug,)),
+            ('notes:edit', (self.note.slug,)),
+            ('notes:delete', (self.note.slug,)),
+            ('notes:api_list', None),
+            ('notes:api_detail', (self.note.slug,)),
+            ('notes:api_bulk', None),
+            ('notes:api_changes', None),
+            ('users:login', None),
+            ('users:logout', None),
+            ('users:signup', None),
+        )
+        users = (
+            ('anonymous', None),
+            ('author', self.author),
+            ('not_author', self.not_author),
+        )
+        query_counts = {}
+        for size in self.DATASET_SIZES:
+            make_notes(
+                [self.author, self.not_author],
+                size,
+                slug_prefix=f'size-{size}'
+            )
+            for name, args in urls:
+                url = reverse(name, args=args)
+                for user_name, user in users:
+                    client = Client()
+                    if user is not None:
+                        client.force_login(user)
+                    cache.clear()
+                    slug_index.clear_local()
+                    with CaptureQueriesContext(connection) as context:
+                        client.get(url)
+                    query_counts.setdefault((name, user_name), []).append(
+                        len(context)
+                    )
+        for (name, user_name), counts in query_counts.items():
+            with self.subTest(name=name, user=user_name):
+                self.assertEqual(
+                    len(set(counts)),
+                    1,
+                    msg=(
+                        f'Число запросов на {name} растёт вместе '
+                        f'с данными: {counts}'
+                    )
+                )
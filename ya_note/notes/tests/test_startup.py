@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+CHECK_MODULES = (
+    'import sys, django; django.setup(); '
+    'import yanote.urls, notes.views; '
+    'print(*(name in sys.modules for name in sys.argv[1:]))'
+)
+
+
+class TestLeanStartup(SimpleTestCase):
+    """Класс проверки облегчённого запуска."""
+
+    def test_lean_profile_skips_unused_imports(self):
+        """Облегчённый профиль не импортирует админку и pytils."""
+        result = subprocess.run(
+            (
+                sys.executable, '-c', CHECK_MODULES,
+                'django.contrib.admin', 'pytils',
+            ),
+            cwd=settings.BASE_DIR,
+            env={
+                **os.environ,
+                'DJANGO_SETTINGS_MODULE': 'yanote.settings_lean',
+            },
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(
+            result.stdout.split(),
+            ['False', 'False'],
+            msg='При запуске импортируются неиспользуемые модули.'
+        )
@@ -0,0 +1,69 @@
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from yanote.static import StaticFilesApplication
+
+
+class TestStaticFiles(SimpleTestCase):
+    """Класс проверки отдачи собранной статики."""
+
+    def setUp(self):
+        """Статика собирается во временный каталог."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.static_root = Path(directory.name)
+        settings_override = override_settings(STATIC_ROOT=self.static_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def request(self, path):
+        """Ответ обёртки на GET-запрос без поддержки сжатия."""
+        response_headers = {}
+
+        def django_application(environ, start_response):
+            start_response('404 Not Found', [])
+            return []
+
+        def start_response(status, headers):
+            response_headers.update(headers, status=status)
+
+        application = StaticFilesApplication(django_application)
+        response = application(
+            {'PATH_INFO': path, 'REQUEST_METHOD': 'GET'}, start_response
+        )
+        body = b''.join(response)
+        getattr(response, 'close', lambda: None)()
+        return response_headers, body
+
+    def test_unhashed_file_has_short_cache(self):
+        """Файл без хеша в имени кешируется ненадолго и не сжимается."""
+        headers, body = self.request(
+            settings.STATIC_URL + 'admin/css/base.css'
+        )
+        self.assertEqual(headers['status'], '200 OK')
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertEqual(
+            headers['Cache-Control'],
+            f'public, max-age={settings.STATIC_MAX_AGE}',
+            msg='Файл без хеша в имени кешируется навсегда.'
+        )
+        self.assertEqual(
+            body,
+            (self.static_root / 'admin/css/base.css').read_bytes()
+        )
+
+    def test_unknown_path_goes_to_django(self):
+        """Пути вне собранной статики обрабатывает Django."""
+        for path in (
+            settings.STATIC_URL + '../settings.py',
+            settings.STATIC_URL + 'admin/css/base.css.gz',
+            '/notes/',
+        ):
+            with self.subTest(path=path):
+                headers, _ = self.request(path)
+                self.assertEqual(headers['status'], '404 Not Found')
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from notes import views
+from notes import api, views
 
 app_name = 'notes'
 
@@ -12,4 +12,16 @@ urlpatterns = [
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
     path('notes/', views.NotesList.as_view(), name='list'),
     path('done/', views.NoteSuccess.as_view(), name='success'),
+    path('api/notes/', api.NotesApi.as_view(), name='api_list'),
+    path(
+        'api/notes/<slug:slug>/',
+        api.NoteApi.as_view(),
+        name='api_detail'
+    ),
+    path('api/bulk/notes/', api.NotesBulkApi.as_view(), name='api_bulk'),
+    path(
+        'api/changes/',
+        api.NoteChangesApi.as_view(),
+        name='api_changes'
+    ),
 ]
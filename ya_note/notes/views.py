@@ -1,9 +1,19 @@
+from http import HTTPStatus
+
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, HttpResponseRedirect
 from django.urls import reverse_lazy
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, quote_etag
+)
+from django.utils.http import http_date
 from django.views import generic
 
-from .forms import NoteForm
-from .models import Note
+from . import cache as notes_cache
+from .forms import CONFLICT_WARNING, NoteForm
+from .idempotency import IdempotentPostMixin
+from .models import EditConflict, Note
+from .ratelimit import RateLimitMixin
 
 
 class Home(generic.TemplateView):
@@ -25,26 +35,81 @@ class NoteBase(LoginRequiredMixin):
         """Пользователь может работать только со своими заметками."""
         return self.model.objects.filter(author=self.request.user)
 
-
-class NoteCreate(NoteBase, generic.CreateView):
+    def get_object(self, queryset=None):
+        """Чужие заметки отсекаются по индексу slug без запроса к БД."""
+        slug = self.kwargs[self.slug_url_kwarg]
+        ref = notes_cache.slug_index.get(slug)
+        if ref is not None and ref.author_id != self.request.user.id:
+            # Локальная запись могла устареть: slug мог перейти к другому
+            # автору в другом процессе. Отказываем по общему кешу.
+            ref = notes_cache.slug_index.get(slug, local=False)
+            if ref is not None and ref.author_id != self.request.user.id:
+                raise Http404
+        note = super().get_object(queryset)
+        if ref is None:
+            notes_cache.slug_index.set(note.slug, note.id, note.author_id)
+        return note
+
+
+class NoteCreate(
+        NoteBase, IdempotentPostMixin, RateLimitMixin, generic.CreateView
+):
     """Добавление заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class EditConflictMixin:
+    """Возвращает форму с ошибкой и кодом 409 при конфликте правок.
+
+    В скрытое поле формы подставляется текущая версия, поэтому повторная
+    отправка осознанно перезапишет чужие изменения.
+    """
+    conflict_message = CONFLICT_WARNING
+
+    def form_valid(self, form):
+        try:
+            return super().form_valid(form)
+        except EditConflict:
+            form.add_error(None, self.conflict_message)
+            form.data = form.data.copy()
+            form.data['version'] = self.get_queryset().values_list(
+                'version', flat=True
+            ).get(pk=self.object.pk)
+            return self.render_to_response(
+                self.get_context_data(form=form),
+                status=HTTPStatus.CONFLICT
+            )
+
+
+class NoteUpdate(
+        NoteBase, IdempotentPostMixin, EditConflictMixin, generic.UpdateView
+):
     """Редактирование заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
+    def form_valid(self, form):
+        if 'slug' in form.changed_data:
+            notes_cache.slug_index.discard(form.initial['slug'])
+        return super().form_valid(form)
+
+
+class SoftDeleteMixin:
+    """Помечает объект удалённым вместо DELETE в запросе."""
+
+    def delete(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        success_url = self.get_success_url()
+        self.object.soft_delete()
+        return HttpResponseRedirect(success_url)
+
 
-class NoteDelete(NoteBase, generic.DeleteView):
+class NoteDelete(NoteBase, SoftDeleteMixin, generic.DeleteView):
     """Удаление заметки."""
     template_name = 'notes/delete.html'
 
@@ -53,7 +118,40 @@ class NotesList(NoteBase, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
 
+    def get_queryset(self):
+        """Список берётся из кеша, пока заметки автора не изменились."""
+        return notes_cache.get_note_list(
+            self.request.user.id, super().get_queryset()
+        )
+
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+    def get(self, request, *args, **kwargs):
+        """Отвечает 304 без рендеринга, если заметка не менялась."""
+        self.object = self.get_object()
+        etag = quote_etag(
+            f'{self.object.pk}-{self.object.updated.timestamp()}'
+        )
+        last_modified = int(self.object.updated.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            context = self.get_context_data(object=self.object)
+            response = self.render_to_response(context)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Заметка видна только автору: общим кешам её хранить нельзя.
+        patch_cache_control(response, private=True, max_age=0)
+        return response
+
+    def get_object(self, queryset=None):
+        """Заметка берётся из кеша, пока заметки автора не изменились."""
+        return notes_cache.get_note(
+            self.request.user.id,
+            self.kwargs[self.slug_url_kwarg],
+            lambda: super(NoteDetail, self).get_object(queryset)
+        )
@@ -22,6 +22,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yanote.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,6 +60,30 @@ DATABASES = {
     }
 }
 
+# Версии и индекс slug в кеше сбрасываются при изменении заметок,
+# поэтому кеш должен быть общим для всех процессов: иначе остальные
+# процессы отдают устаревшие заметки. Файловый кеш общий для процессов
+# одного сервера; для нескольких серверов нужен Memcached или Redis.
+# Кеш в памяти процесса отклоняет проверка notes.E001.
+CACHES = {
+    'default': {
+        'BACKEND': 'yanote.metrics.InstrumentedFileBasedCache',
+        'LOCATION': BASE_DIR / '.cache',
+        'OPTIONS': {'MAX_ENTRIES': 10_000},
+    }
+}
+
+
+# Сессии читаются из кеша и только при промахе из БД. Для узлов без
+# общего кеша подходит 'django.contrib.sessions.backends.signed_cookies'.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+AUTHENTICATION_BACKENDS = [
+    'notes.backends.CachedModelBackend',
+]
+
+AUTH_USER_CACHE_TIMEOUT = 60
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -83,7 +108,39 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Хешированные имена и сжатые копии строятся при collectstatic.
+STATICFILES_STORAGE = 'yanote.storage.CompressedManifestStaticFilesStorage'
+
+# Время кеширования статики без хеша в имени, в секундах.
+STATIC_MAX_AGE = 60
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+# Размер страницы JSON API по умолчанию и наибольший допустимый.
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+# Сколько заметок можно получить одним запросом по списку slug.
+API_MAX_BULK_SLUGS = 500
+
+NOTES_CACHE_TIMEOUT = 60 * 15
+NOTES_SLUG_INDEX_SIZE = 10_000
+NOTES_SLUG_INDEX_LOCAL_TTL = 5
+
+# Ограничение частоты POST-запросов, см. notes/ratelimit.py.
+# RATELIMIT_BACKEND: 'local' — память процесса, 'cache' — общий кеш.
+RATELIMIT_ENABLED = True
+RATELIMIT_BACKEND = 'local'
+RATELIMIT_RATE = 0.5
+RATELIMIT_BURST = 10
+
+# Повторная отправка формы, см. notes/idempotency.py.
+IDEMPOTENCY_TIMEOUT = 60 * 10
+IDEMPOTENCY_WAIT_MS = 2000
+
+# Метрики Prometheus по адресу /metrics/, см. yanote/metrics.py.
+METRICS_ALLOWED_IPS = ['127.0.0.1']
@@ -0,0 +1,106 @@
+"""Замер импортов при запуске процесса до готовности реестра приложений.
+
+Включается переменной окружения DJANGO_STARTUP_PROFILE. Отчёт в формате
+python -X importtime пишется в stderr: собственное и накопленное время
+импорта модулей в микросекундах, самые долгие модули сверху.
+"""
+import os
+import sys
+import time
+from importlib.abc import MetaPathFinder
+
+ENV_VAR = 'DJANGO_STARTUP_PROFILE'
+TOP_MODULES = 30
+
+_timer = None
+
+
+class ImportTimer(MetaPathFinder):
+    """Finder, который засекает выполнение модулей остальных finder'ов."""
+
+    def __init__(self):
+        self.started = time.perf_counter_ns()
+        self.timings = {}
+        self._children = []
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        loader = spec.loader
+        # Встроенные и замороженные модули грузятся классами-загрузчиками,
+        # их не подменяем, чтобы не задеть все остальные импорты.
+        if loader is not None and not isinstance(loader, type):
+            try:
+                loader.exec_module = self._timed(name, loader.exec_module)
+            except AttributeError:
+                pass
+        return spec
+
+    def _timed(self, name, exec_module):
+        def timed_exec_module(module):
+            self._children.append(0)
+            start = time.perf_counter_ns()
+            try:
+                exec_module(module)
+            finally:
+                cumulative = time.perf_counter_ns() - start
+                children = self._children.pop()
+                if self._children:
+                    self._children[-1] += cumulative
+                self.timings[name] = (cumulative - children, cumulative)
+        return timed_exec_module
+
+    def report(self, label, stream):
+        elapsed = (time.perf_counter_ns() - self.started) / 1e6
+        stream.write(
+            'import time: self [us] | cumulative | imported package\n'
+        )
+        slowest = sorted(
+            self.timings.items(), key=lambda item: item[1][1], reverse=True
+        )
+        for name, (own, cumulative) in slowest[:TOP_MODULES]:
+            stream.write(
+                f'import time: {own // 1000:>9} | {cumulative // 1000:>10} '
+                f'| {name}\n'
+            )
+        stream.write(
+            f'{label}: реестр приложений готов за {elapsed:.1f} мс, '
+            f'импортировано модулей: {len(self.timings)}\n'
+        )
+
+
+def enabled():
+    return bool(os.environ.get(ENV_VAR))
+
+
+def begin():
+    """Начинает замер, если он включён в окружении."""
+    global _timer
+    if enabled() and _timer is None:
+        _timer = ImportTimer()
+        sys.meta_path.insert(0, _timer)
+
+
+def report(label, stream=None):
+    """Печатает отчёт и снимает замер; вызывается после django.setup()."""
+    global _timer
+    if _timer is None:
+        return
+    sys.meta_path.remove(_timer)
+    _timer.report(label, stream or sys.stderr)
+    _timer = None
+
+
+def setup_and_report(label):
+    """Поднимает реестр приложений заранее, чтобы отчитаться о запуске."""
+    if _timer is None:
+        return
+    import django
+    django.setup()
+    report(label)
@@ -0,0 +1,92 @@
+"""WSGI-обёртка, отдающая собранную статику в обход Django."""
+import mimetypes
+import os
+import re
+from wsgiref.headers import Headers
+
+from django.conf import settings
+
+# Имена вида style.3f1a2b4c5d6e.css, которые строит Manifest-хранилище.
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+FOREVER = 60 * 60 * 24 * 365
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class StaticFilesApplication:
+    """Отдаёт файлы из STATIC_ROOT, остальное передаёт приложению.
+
+    Список файлов строится один раз при запуске, поэтому запрос
+    к статике не обращается к файловой системе за проверками, а пути
+    вне STATIC_ROOT не могут быть отданы. Хешированные имена кешируются
+    браузером навсегда, прочие — на STATIC_MAX_AGE секунд.
+    """
+
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.root = root or settings.STATIC_ROOT
+        self.prefix = prefix or settings.STATIC_URL
+        self.files = self.scan()
+
+    def scan(self):
+        files = {}
+        if not self.root or not os.path.isdir(self.root):
+            return files
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(directory, name)
+                relative = os.path.relpath(path, self.root)
+                files[self.prefix + relative.replace(os.sep, '/')] = path
+        return files
+
+    def __call__(self, environ, start_response):
+        url = environ.get('PATH_INFO', '')
+        if url not in self.files or url.endswith(('.gz', '.br')):
+            return self.application(environ, start_response)
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            start_response('405 Method Not Allowed', [('Allow', 'GET, HEAD')])
+            return []
+        return self.serve(environ, start_response, url)
+
+    def serve(self, environ, start_response, url):
+        path = self.files[url]
+        content_type, _ = mimetypes.guess_type(path)
+        headers = Headers([
+            ('Content-Type', content_type or 'application/octet-stream'),
+            ('Vary', 'Accept-Encoding'),
+        ])
+        if HASHED_NAME.search(url):
+            headers['Cache-Control'] = f'public, max-age={FOREVER}, immutable'
+        else:
+            headers['Cache-Control'] = (
+                f'public, max-age={settings.STATIC_MAX_AGE}'
+            )
+        accepted = {
+            token.split(';')[0].strip()
+            for token in environ.get('HTTP_ACCEPT_ENCODING', '').split(',')
+        }
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted and url + suffix in self.files:
+                path = self.files[url + suffix]
+                headers['Content-Encoding'] = encoding
+                break
+        headers['Content-Length'] = str(os.path.getsize(path))
+        start_response('200 OK', headers.items())
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        file_wrapper = environ.get('wsgi.file_wrapper', FileIterator)
+        return file_wrapper(open(path, 'rb'))
+
+
+class FileIterator:
+    """Замена wsgi.file_wrapper для серверов, которые его не дают."""
+
+    block_size = 64 * 1024
+
+    def __init__(self, file):
+        self.file = file
+
+    def __iter__(self):
+        return iter(lambda: self.file.read(self.block_size), b'')
+
+    def close(self):
+        self.file.close()
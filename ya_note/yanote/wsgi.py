@@ -11,6 +11,13 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from yanote import startup
+from yanote.static import StaticFilesApplication
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
 
-application = get_wsgi_application()
+startup.begin()
+
+application = StaticFilesApplication(get_wsgi_application())
+
+startup.report('wsgi')